@@ -0,0 +1,131 @@
+"""
+Wait timeouts and polling learned from how long elements actually take.
+
+Every wait in helpers.py goes through `wait_until`, which polls tightly at first
+(25 ms, doubling up to 250 ms) instead of WebDriverWait's fixed 500 ms, and
+records how long the condition took to hold, keyed by the route it was waited
+on, the kind of wait and the locator. When a wait is called without an explicit
+timeout, the timeout is the p99 of those recorded times multiplied by
+--wait-timeout-multiplier, no lower than --wait-timeout-floor and never above
+the old fixed 10 s. Until a locator has enough samples it keeps the 10 s.
+A timeout passed explicitly is always used as given.
+
+Samples are kept in the timing store across runs. `--fixed-waits` restores the
+10 s timeout and 500 ms polling everywhere.
+"""
+import time
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+
+from stats import percentile
+from timing_store import TimingStore
+
+DEFAULT_TIMEOUT = 10
+FIXED_POLL = 0.5
+MIN_POLL = 0.025
+MAX_POLL = 0.25
+MIN_SAMPLES = 5
+
+
+class WaitSettings:
+    adaptive = True
+    multiplier = 3.0
+    floor = 2.0
+
+
+settings = WaitSettings()
+history = {}
+new_samples = []
+
+
+def target_of(target):
+    """A readable key for a locator tuple or a plain value such as a URL."""
+    if isinstance(target, tuple):
+        by, value = target
+        return f"{by}={value}"
+    return str(target)
+
+
+def learned_timeout(key):
+    samples = history.get(key, [])
+    if len(samples) < MIN_SAMPLES:
+        return DEFAULT_TIMEOUT
+    return min(max(percentile(samples, 99) * settings.multiplier, settings.floor), DEFAULT_TIMEOUT)
+
+
+def wait_until(driver, condition, kind, target, timeout=None):
+    """
+    Poll `condition(driver)` until it returns something truthy, and return that.
+
+    Raises TimeoutException once `timeout` seconds have passed; with no timeout
+    given, the one learned for this route, kind of wait and target is used.
+    """
+    if not settings.adaptive:
+        timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        delay = max_delay = FIXED_POLL
+        key = None
+    else:
+        try:
+            route = urlsplit(driver.current_url).path or "/"
+        except WebDriverException:
+            route = ""
+        key = (route, kind, target_of(target))
+        timeout = learned_timeout(key) if timeout is None else timeout
+        delay, max_delay = MIN_POLL, MAX_POLL
+    start = time.perf_counter()
+    while True:
+        try:
+            value = condition(driver)
+            if value:
+                if key:
+                    elapsed = time.perf_counter() - start
+                    history.setdefault(key, []).append(elapsed)
+                    new_samples.append((*key, elapsed))
+                return value
+        except NoSuchElementException:
+            pass
+        remaining = timeout - (time.perf_counter() - start)
+        if remaining <= 0:
+            raise TimeoutException(f"{kind} {target_of(target)} did not happen within {timeout:.1f}s")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("waits")
+    group.addoption(
+        "--fixed-waits", action="store_true", default=False,
+        help="use the fixed 10s timeout and 0.5s polling instead of timeouts learned from past runs",
+    )
+    group.addoption(
+        "--wait-timeout-multiplier", type=float, default=3.0,
+        help="learned timeout = p99 of observed wait times x this (default: 3)",
+    )
+    group.addoption(
+        "--wait-timeout-floor", type=float, default=2.0,
+        help="lowest learned timeout in seconds (default: 2)",
+    )
+
+
+def pytest_configure(config):
+    settings.adaptive = not config.getoption("fixed_waits")
+    settings.multiplier = config.getoption("wait_timeout_multiplier")
+    settings.floor = config.getoption("wait_timeout_floor")
+    if settings.adaptive:
+        history.update(TimingStore(config.getoption("timing_db")).wait_samples())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    new_samples.extend(tuple(s) for s in getattr(node, "workeroutput", {}).get("wait_samples", []))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["wait_samples"] = new_samples
+        return
+    if new_samples:
+        TimingStore(config.getoption("timing_db")).save_wait_samples(new_samples)
@@ -0,0 +1,249 @@
+"""
+Shared client for the backend API.
+
+Every call made through `api` is timed: connect time (zero when a kept-alive
+connection is reused), time to first byte, total time, payload sizes and status.
+Samples are aggregated per endpoint and summarized at the end of the session;
+`--api-timings=PATH` also writes the raw samples as JSON.
+
+`endpoint_log` lists, per thread, every endpoint called through `api` plus the
+ones a caller relied on without a request (a cached login, a pooled user's
+signup); the impact map reads it.
+"""
+import json
+import re
+import string
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from config import API_BASE_URL, SUPERUSER_EMAIL, SUPERUSER_PASSWORD
+from datagen import RUN_SALT, seeded_random
+from stats import summarize
+
+API_V1_STR = "/api/v1"
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$")
+
+_random = seeded_random("api_helpers")
+_connect = threading.local()
+api_timings = []
+endpoint_log = []
+_superuser_headers = {}
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect.seconds = time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def endpoint_of(method, url):
+    """Group a request by method and path template, e.g. 'PUT /items/{id}'."""
+    path = urlsplit(url).path
+    if path.startswith(API_V1_STR):
+        path = path[len(API_V1_STR):]
+    segments = []
+    for segment in path.split("/"):
+        if _ID_SEGMENT.match(segment):
+            segment = "{id}"
+        elif "@" in segment:
+            segment = "{email}"
+        segments.append(segment)
+    return f"{method} {'/'.join(segments)}"
+
+
+def note_endpoint(endpoint):
+    """Record that the current thread used `endpoint`, whether or not it sent a request."""
+    endpoint_log.append((threading.current_thread().name, endpoint))
+
+
+class TimingAdapter(HTTPAdapter):
+    """Transport adapter that records a timing sample for every request it sends."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        _connect.seconds = 0.0
+        start = time.perf_counter()
+        response = super().send(request, stream=True, **kwargs)
+        ttfb = time.perf_counter() - start
+        if not stream:
+            response.content
+        total = time.perf_counter() - start
+        endpoint = endpoint_of(request.method, request.url)
+        note_endpoint(endpoint)
+        api_timings.append({
+            "endpoint": endpoint,
+            "status": response.status_code,
+            "connect_ms": _connect.seconds * 1000,
+            "ttfb_ms": ttfb * 1000,
+            "total_ms": total * 1000,
+            "request_bytes": len(request.body or b""),
+            "response_bytes": len(response.content) if not stream else None,
+        })
+        return response
+
+
+class ApiSession(requests.Session):
+    """requests.Session that resolves paths like '/users/' against the API root."""
+
+    def __init__(self, base_url=API_BASE_URL):
+        super().__init__()
+        self.base_url = base_url
+        adapter = TimingAdapter()
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith("/"):
+            url = f"{self.base_url}{API_V1_STR}{url}"
+        return super().request(method, url, *args, **kwargs)
+
+
+api = ApiSession()
+
+
+def random_lower_string(length: int = 12) -> str:
+    """Generate a random string of lowercase letters."""
+    return "".join(_random.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def random_email() -> str:
+    """Generate a random email address."""
+    return f"{random_lower_string()}{RUN_SALT}@test-api.com"
+
+
+def get_auth_headers(email: str, password: str) -> dict[str, str]:
+    """Authenticate a user and return authorization headers."""
+    login_data = {"username": email, "password": password}
+    try:
+        response = api.post("/login/access-token", data=login_data)
+        response.raise_for_status()
+        tokens = response.json()
+        access_token = tokens["access_token"]
+        return {"Authorization": f"Bearer {access_token}"}
+    except requests.exceptions.ConnectionError as e:
+        pytest.fail(
+            f"API request failed during authentication for {email}. "
+            f"Is the server running at {api.base_url}? Error: {e}"
+        )
+    # Let HTTPError and other exceptions propagate for test assertions
+
+
+def get_superuser_auth_headers() -> dict[str, str]:
+    """Get auth headers for the default superuser (the pre-minted ones if available)."""
+    if _superuser_headers:
+        note_endpoint("POST /login/access-token")
+        return dict(_superuser_headers)
+    return get_auth_headers(SUPERUSER_EMAIL, SUPERUSER_PASSWORD)
+
+
+def premint_superuser_headers() -> dict[str, str]:
+    """Log the superuser in once so later get_superuser_auth_headers calls skip the login."""
+    _superuser_headers.update(get_auth_headers(SUPERUSER_EMAIL, SUPERUSER_PASSWORD))
+    return dict(_superuser_headers)
+
+
+def create_user_and_get_headers(
+    full_name: str, email: str, password: str
+) -> dict[str, str]:
+    """Helper to register a new user and return their auth headers."""
+    user_payload = {"full_name": full_name, "email": email, "password": password}
+    response = api.post("/users/signup", json=user_payload)
+    assert response.status_code == 200, f"Failed to sign up user {email}"
+    return get_auth_headers(email, password)
+
+
+def summarize_timings(samples):
+    """Per-endpoint summary of the recorded samples, keyed by endpoint."""
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample["endpoint"]].append(sample)
+    summary = {}
+    for endpoint, group in sorted(by_endpoint.items()):
+        statuses = defaultdict(int)
+        for sample in group:
+            statuses[str(sample["status"])] += 1
+        summary[endpoint] = {
+            "total_ms": summarize(s["total_ms"] for s in group),
+            "ttfb_ms": summarize(s["ttfb_ms"] for s in group),
+            "connect_ms": summarize(s["connect_ms"] for s in group),
+            "request_bytes": summarize(s["request_bytes"] for s in group),
+            "response_bytes": summarize(s["response_bytes"] for s in group if s["response_bytes"] is not None),
+            "statuses": dict(statuses),
+        }
+    return summary
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--api-timings", metavar="PATH", default=None,
+        help="write every API call's timing sample and the per-endpoint summary as JSON to PATH",
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    api_timings.extend(getattr(node, "workeroutput", {}).get("api_timings", []))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["api_timings"] = api_timings
+        return
+    path = config.getoption("api_timings")
+    if path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"summary": summarize_timings(api_timings), "samples": api_timings}, f, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workeroutput") or not api_timings:
+        return
+    terminalreporter.write_sep("-", "API latency per endpoint (ms)")
+    terminalreporter.write_line(
+        f"{'endpoint':<36} {'calls':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} "
+        f"{'ttfb p95':>9} {'connect':>8} {'resp B':>8}  statuses"
+    )
+    for endpoint, s in summarize_timings(api_timings).items():
+        total = s["total_ms"]
+        statuses = ", ".join(f"{code}x{n}" for code, n in sorted(s["statuses"].items()))
+        resp_mean = s["response_bytes"].get("mean", 0)
+        terminalreporter.write_line(
+            f"{endpoint:<36} {total['count']:>5} {total['p50']:>8.1f} {total['p95']:>8.1f} "
+            f"{total['p99']:>8.1f} {total['max']:>8.1f} {s['ttfb_ms']['p95']:>9.1f} "
+            f"{s['connect_ms']['mean']:>8.1f} {resp_mean:>8.0f}  {statuses}"
+        )
@@ -0,0 +1,345 @@
+"""
+Shared pieces for the benchmarks under tests/benchmarks.
+
+Benchmarks are marked `benchmark` and skipped unless `--benchmarks` is given;
+they seed large amounts of data and run for minutes, so they never run as part
+of the normal suite. Each benchmark gets a `bench` fixture to add measurement
+points to; the points are written as JSON to .perf/benchmarks/<test>.json (or
+--benchmark-dir) when the test ends, even if it fails halfway, and the files
+written are listed at the end of the run.
+
+Seeding and measuring go through their own sessions (`client_session()`), so
+benchmark traffic stays out of the suite's API timings and latency budgets. Data
+a benchmark seeds is deleted again when it ends, unless --bench-keep-data keeps
+it for the next run: the admin scaling users, the accounts the signup
+throughput benchmark creates, and the pagination items. Those items belong to a
+generated user of their own (deleting a user deletes their items), so the shared
+superuser's items stay as the UI tests expect them.
+
+`ramp()` drives a request from a rising number of concurrent clients for a fixed
+time per step (--bench-concurrency-levels, --bench-step-duration) and reports
+throughput, the latency distribution and the status and error counts per step;
+`find_knee()` picks the step after which more clients only add latency.
+"""
+import json
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from api_helpers import API_V1_STR, api, get_superuser_auth_headers
+from datagen import BackendLoader, DataGenerator, load
+from stats import summarize
+
+DEFAULT_BENCH_DIR = Path(__file__).parent / ".perf" / "benchmarks"
+
+written = []
+
+
+class BenchResults:
+    """Measurement points of one benchmark, saved as JSON."""
+
+    def __init__(self, name, directory):
+        self.name = name
+        self.path = Path(directory) / f"{name}.json"
+        self.points = []
+        self.summary = {}
+
+    def add(self, **point):
+        self.points.append(point)
+        return point
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w", encoding="utf-8") as f:
+            json.dump({"benchmark": self.name, "summary": self.summary, "points": self.points}, f, indent=2)
+        return self.path
+
+
+def measure_ms(fn, repeat=5):
+    """Call `fn` `repeat` times; summary of the wall-clock times in ms."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return summarize(times)
+
+
+def client_session(concurrency=1):
+    """A session with a connection per client, kept out of the suite's API timings."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_client = client_session()
+
+
+def api_root():
+    """The API root URL, wherever `api` points (the stand-in backend moves it)."""
+    return f"{api.base_url}{API_V1_STR}"
+
+
+def get(path, headers):
+    """GET `path` under the API root on the benchmarks' own session; raises on error statuses."""
+    response = _client.get(f"{api_root()}{path}", headers=headers)
+    response.raise_for_status()
+    return response
+
+
+def user_count():
+    return get("/users/?limit=1", get_superuser_auth_headers()).json()["count"]
+
+
+def seed_users(target, seed=0, concurrency=32, created=None):
+    """
+    Create generated users until the backend has at least `target`; returns the
+    count. The ids of the users created are appended to `created`.
+    """
+    count = user_count()
+    if count < target:
+        generator = DataGenerator(f"{seed}-{count}")
+        loader = BackendLoader(api.base_url, concurrency)
+
+        def create(user):
+            user_id = loader.create_user(user)["id"]
+            if created is not None:
+                created.append(user_id)
+
+        load(generator.users(target - count), create, concurrency, label=f"users to {target}")
+    return user_count()
+
+
+def remove_users(user_ids, concurrency=32):
+    """Delete the users `seed_users()` created."""
+    if user_ids:
+        loader = BackendLoader(api.base_url, concurrency)
+        load(user_ids, loader.delete_user, concurrency, label="seeded users removed")
+
+
+def bench_user(seed=0, name="bench"):
+    """A generated user reserved for one kind of benchmark, created on first use; returns it with its headers."""
+    user = next(DataGenerator(f"{seed}-{name}").users(1))
+    loader = BackendLoader(api.base_url, 1)
+    try:
+        headers = loader.login(user["email"], user["password"])
+    except requests.HTTPError:
+        loader.create_user(user)
+        headers = loader.login(user["email"], user["password"])
+    return user, headers
+
+
+def bench_user_headers(seed=0):
+    """Auth headers of the generated user the API benchmarks share."""
+    return bench_user(seed)[1]
+
+
+def user_id(headers):
+    return get("/users/me", headers).json()["id"]
+
+
+def item_count(headers):
+    return get("/items/?limit=1", headers).json()["count"]
+
+
+def seed_items(headers, target, seed=0, concurrency=32):
+    """Create generated items owned by `headers`' user until it lists at least `target`; returns the count."""
+    count = item_count(headers)
+    if count < target:
+        generator = DataGenerator(f"{seed}-{count}")
+        loader = BackendLoader(api.base_url, concurrency)
+        loader.owner_headers = [headers]
+        load(generator.items(target - count, owners=1), loader.create_item, concurrency, label=f"items to {target}")
+    return item_count(headers)
+
+
+def fit_growth(xs, ys):
+    """
+    Least-squares line through (x, y) plus the log-log slope over the points with
+    x > 0: an exponent near 0 means flat, near 1 means y grows linearly with x.
+    """
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    slope = sxy / sxx if sxx else 0.0
+    fit = {
+        "slope": slope,
+        "intercept": mean_y - slope * mean_x,
+        "r2": sxy * sxy / (sxx * syy) if sxx and syy else 0.0,
+        "exponent": None,
+    }
+    logs = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(logs) >= 2:
+        fit["exponent"] = fit_growth([lx for lx, _ in logs], [ly for _, ly in logs])["slope"]
+    return fit
+
+
+def drive(send, concurrency, duration):
+    """
+    Call `send(session, root, n)` from `concurrency` threads for `duration`
+    seconds, where `root` is the API root URL and `n` numbers the call; `send`
+    returns the response. Returns throughput, latency summary (ms) and counts per
+    status, with exceptions counted as errors and 409s as conflicts.
+    """
+    root = api_root()
+    session = client_session(concurrency)
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    counter = iter(range(1 << 62))
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            with lock:
+                n = next(counter)
+            start = time.perf_counter()
+            try:
+                status = send(session, root, n).status_code
+            except requests.RequestException:
+                status = "error"
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(client) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    session.close()
+    total = len(latencies)
+    failed = sum(n for status, n in statuses.items() if status == "error" or status >= 400)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "per_s": total / elapsed,
+        "latency_ms": summarize(latencies),
+        "statuses": {str(status): n for status, n in sorted(statuses.items(), key=str)},
+        "error_rate": failed / total if total else 0.0,
+        "conflict_rate": statuses[409] / total if total else 0.0,
+    }
+
+
+def ramp(send, levels, duration, label="ramp"):
+    """`drive()` at each concurrency level in turn; one result per level."""
+    results = []
+    for concurrency in levels:
+        result = drive(send, concurrency, duration)
+        latency = result["latency_ms"]
+        print(
+            f"{label} x{concurrency}: {result['per_s']:.0f}/s, p50 {latency.get('p50', 0):.1f} ms, "
+            f"p99 {latency.get('p99', 0):.1f} ms, errors {result['error_rate']:.1%}, "
+            f"conflicts {result['conflict_rate']:.1%}"
+        )
+        results.append(result)
+    return results
+
+
+def find_knee(results, min_gain=0.1, max_slowdown=1.5):
+    """
+    The knee of a `ramp()`: the last concurrency level before one where
+    throughput grew by less than `min_gain` while p50 latency grew by more than
+    `max_slowdown` times. None if throughput kept scaling to the last step.
+    """
+    for previous, current in zip(results, results[1:]):
+        gain = current["per_s"] / previous["per_s"] - 1 if previous["per_s"] else 0.0
+        slowdown = current["latency_ms"].get("p50", 0) / (previous["latency_ms"].get("p50") or 1)
+        if gain < min_gain and slowdown > max_slowdown:
+            return previous
+    return None
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmarks", action="store_true", default=False,
+        help="run the benchmarks in tests/benchmarks (skipped otherwise)",
+    )
+    group.addoption(
+        "--benchmark-dir", metavar="DIR", default=str(DEFAULT_BENCH_DIR),
+        help="where benchmark results are written (default: .perf/benchmarks)",
+    )
+    group.addoption(
+        "--bench-seed", type=int, default=0,
+        help="seed for the data benchmarks generate (default: 0)",
+    )
+    group.addoption(
+        "--bench-concurrency", type=int, default=32,
+        help="requests in flight while seeding benchmark data (default: 32)",
+    )
+    group.addoption(
+        "--bench-items", type=int, default=100000,
+        help="items the pagination benchmark seeds for each user it lists as (default: 100000)",
+    )
+    group.addoption(
+        "--bench-limits", default="10,100,1000",
+        help="page sizes the pagination benchmark sweeps (default: 10,100,1000)",
+    )
+    group.addoption(
+        "--bench-concurrency-levels", default="1,2,4,8,16,32,64",
+        help="client counts the concurrency benchmarks step through (default: 1,2,4,8,16,32,64)",
+    )
+    group.addoption(
+        "--bench-step-duration", type=float, default=10.0,
+        help="seconds each concurrency step runs (default: 10)",
+    )
+    group.addoption(
+        "--bench-user-counts", default="1000,10000,100000",
+        help="user-table sizes the admin scaling benchmark seeds up to (default: 1000,10000,100000)",
+    )
+    group.addoption(
+        "--bench-keep-data", action="store_true", default=False,
+        help="keep the users and items benchmarks seed instead of deleting them when they end",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def bench(request):
+    """Collects the benchmark's points and writes them out at the end of the test."""
+    results = BenchResults(request.node.name, request.config.getoption("benchmark_dir"))
+    yield results
+    written.append(str(results.save()))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    written.extend(getattr(node, "workeroutput", {}).get("bench_written", []))
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["bench_written"] = written
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workeroutput") or not written:
+        return
+    terminalreporter.write_sep("-", "benchmark results")
+    for path in written:
+        terminalreporter.write_line(path)
@@ -0,0 +1,147 @@
+"""
+Shared, pre-warmed HTTP cache for the browsers of a run.
+
+With `--browser-cache`, every Chrome is pointed at a disk cache outside its
+throwaway profile (--disk-cache-dir). Each browser works on its own copy of a
+template cache, so parallel workers, and the read-only page's browser next to a
+test's own, never write to the same directory; a copy goes back to its process's
+pool when its browser quits and is reused by the next one. At the end of the run
+the most recently used copy becomes the template for the next run. Static
+assets are therefore downloaded once and later page loads are served from cache.
+
+With --shared-browser only the shared Chrome itself gets a copy. The contexts
+tests run in are incognito-like and keep their HTTP cache in memory, so they
+start cold and nothing they load reaches the template.
+
+Cache effectiveness is read from Resource Timing before each navigation and at
+quit: a hit is a resource with a body but no bytes transferred, a revalidation
+a 304 (headers only). The hit rate is reported at the end of the session.
+"""
+import itertools
+import shutil
+from pathlib import Path
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from config import WORKER_ID
+from driver_hooks import add_command_hook
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "chrome"
+
+_RESOURCES_SCRIPT = """
+return performance.getEntriesByType('resource').map(e => [e.transferSize, e.encodedBodySize, e.decodedBodySize]);
+"""
+
+cache_dir_key = pytest.StashKey[Path]()
+_free_dirs = []
+_copies = itertools.count()
+
+cache_stats = {"resources": 0, "hits": 0, "revalidated": 0, "bytes_transferred": 0, "bytes_from_cache": 0}
+
+
+def acquire_cache_dir(config):
+    """A copy of the template cache no running browser uses: one a quit browser left, or a new one."""
+    if _free_dirs:
+        return _free_dirs.pop()
+    root = Path(config.getoption("browser_cache_dir"))
+    directory = root / f"{WORKER_ID}-{next(_copies)}"
+    template = root / "template"
+    # A copy left by a run that never finished is stale once a later run has saved a template.
+    if directory.exists() and template.exists() and template.stat().st_mtime > directory.stat().st_mtime:
+        shutil.rmtree(directory)
+    if not directory.exists():
+        if template.exists():
+            shutil.copytree(template, directory)
+        else:
+            directory.mkdir(parents=True)
+    return directory
+
+
+def count_resources(driver):
+    try:
+        resources = driver.execute_script(_RESOURCES_SCRIPT)
+    except WebDriverException:
+        return
+    for transferred, encoded, decoded in resources:
+        cache_stats["resources"] += 1
+        cache_stats["bytes_transferred"] += transferred
+        if transferred == 0 and decoded > 0:
+            cache_stats["hits"] += 1
+            cache_stats["bytes_from_cache"] += encoded
+        elif 0 < transferred < encoded:
+            cache_stats["revalidated"] += 1
+            cache_stats["bytes_from_cache"] += encoded
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("browser cache")
+    group.addoption(
+        "--browser-cache", action="store_true", default=False,
+        help="share a persistent, pre-warmed HTTP disk cache between the run's browsers",
+    )
+    group.addoption(
+        "--browser-cache-dir", metavar="DIR", default=str(DEFAULT_CACHE_DIR),
+        help="where the template cache and per-browser copies live (default: .cache/chrome)",
+    )
+
+
+def pytest_driver_options(options, request):
+    if request.config.getoption("browser_cache"):
+        directory = acquire_cache_dir(request.config)
+        request.node.stash[cache_dir_key] = directory
+        options.add_argument(f"--disk-cache-dir={directory.resolve()}")
+
+
+def pytest_driver_created(driver, request):
+    if not request.config.getoption("browser_cache"):
+        return
+    directory = request.node.stash[cache_dir_key]
+
+    def hook(driver, command, params, execute):
+        if command in (Command.GET, Command.QUIT):
+            count_resources(driver)
+        response = execute(command, params)
+        if command == Command.QUIT:
+            _free_dirs.append(directory)
+        return response
+
+    add_command_hook(driver, hook)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for key, value in getattr(node, "workeroutput", {}).get("browser_cache_stats", {}).items():
+        cache_stats[key] += value
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("browser_cache"):
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["browser_cache_stats"] = cache_stats
+        return
+    root = Path(config.getoption("browser_cache_dir"))
+    copies = [d for d in root.glob("*") if d.is_dir() and d.name != "template"]
+    if not copies:
+        return
+    newest = max(copies, key=lambda d: d.stat().st_mtime)
+    shutil.rmtree(root / "template", ignore_errors=True)
+    newest.rename(root / "template")
+    for stale in copies:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("browser_cache") or hasattr(config, "workeroutput") or not cache_stats["resources"]:
+        return
+    total = cache_stats["resources"]
+    terminalreporter.write_sep("-", "browser HTTP cache")
+    terminalreporter.write_line(
+        f"{total} resources: {cache_stats['hits']} cache hits ({cache_stats['hits'] / total:.0%}), "
+        f"{cache_stats['revalidated']} revalidated (304), "
+        f"{cache_stats['bytes_from_cache'] / 1024:.0f} KiB from cache, "
+        f"{cache_stats['bytes_transferred'] / 1024:.0f} KiB transferred"
+    )
@@ -0,0 +1,57 @@
+"""
+Isolated browser contexts inside one Chrome process.
+
+A BrowserContext is Chrome's incognito-like partition: its own cookies, local
+storage and cache, created over CDP with Target.createBrowserContext and shown
+in its own window. ChromeDriver window handles are CDP target ids, so switching
+between contexts is an ordinary switch_to.window.
+
+WindowContext stands for a window of the browser's default context (a test's own
+Chrome, or the read-only page), so tests can switch back to their main window the
+same way whichever kind they were given.
+"""
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+context_key = pytest.StashKey["WindowContext"]()
+
+
+class WindowContext:
+    """A window of the browser's default context."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.handle = driver.current_window_handle
+
+    def activate(self):
+        """Send the driver's following commands to this context's window."""
+        self.driver.switch_to.window(self.handle)
+        return self.driver
+
+    def close(self):
+        """The default context belongs to the browser; nothing to dispose of."""
+
+
+class BrowserContext(WindowContext):
+    """A new isolated context, with its own window, in an already running Chrome."""
+
+    def __init__(self, driver, url="about:blank"):
+        self.driver = driver
+        try:
+            self.previous = driver.current_window_handle
+        except WebDriverException:
+            self.previous = None
+        self.context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        self.handle = driver.execute_cdp_cmd(
+            "Target.createTarget", {"url": url, "browserContextId": self.context_id, "newWindow": True}
+        )["targetId"]
+        self.activate()
+
+    def close(self):
+        """Dispose of the context and its window, then return to the window that was active before it."""
+        self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": self.context_id})
+        handles = self.driver.window_handles
+        if self.previous in handles:
+            self.driver.switch_to.window(self.previous)
+        elif handles:
+            self.driver.switch_to.window(handles[0])
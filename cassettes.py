@@ -0,0 +1,211 @@
+"""
+Record/replay of API interactions per test.
+
+`--api-cassettes=record` sends requests through as usual and saves each test's
+request/response pairs to cassettes/<test path>.json. `--api-cassettes=replay`
+serves them from memory instead of the network. Values that change every run
+are normalized to numbered placeholders in first-seen order: email addresses,
+passwords in request bodies and access tokens. On replay the placeholders in
+recorded responses are swapped back for this run's values, so assertions such as
+`data["email"] == email` still hold. A request that has no recorded counterpart
+raises CassetteMismatch; nothing ever falls through to the network.
+
+Only tests that use `api_backend` (the API suite) get a cassette; UI tests and
+benchmarks always talk to the live services. Cassettes are meant to be committed
+next to the tests, so a replay run needs no backend at all; re-record and commit
+them when the API or the tests change.
+"""
+import json
+import re
+from collections import defaultdict, deque
+from http.client import responses as reasons
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from api_helpers import api
+
+DEFAULT_CASSETTE_DIR = Path(__file__).parent / "cassettes"
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PLACEHOLDER = re.compile(r"<(email|password|token)-\d+>")
+SECRET_FIELDS = ("password", "new_password", "current_password")
+
+
+class CassetteMismatch(Exception):
+    """A request was made that the cassette has no recording for."""
+
+
+class Normalizer:
+    """Maps run-specific values to stable placeholders, and back."""
+
+    def __init__(self):
+        self.placeholders = {}
+        self.values = {}
+        self.counts = defaultdict(int)
+
+    def placeholder(self, kind, value):
+        if PLACEHOLDER.fullmatch(value):
+            return value
+        if value not in self.placeholders:
+            self.counts[kind] += 1
+            name = f"<{kind}-{self.counts[kind]}>"
+            self.placeholders[value] = name
+            self.values[name] = value
+        return self.placeholders[value]
+
+    def text(self, text):
+        return EMAIL.sub(lambda m: self.placeholder("email", m.group()), text)
+
+    def fields(self, fields):
+        return {
+            k: self.placeholder("password", v) if k in SECRET_FIELDS and isinstance(v, str) else v
+            for k, v in fields.items()
+        }
+
+    def body(self, body, content_type):
+        if not body:
+            return ""
+        if isinstance(body, bytes):
+            body = body.decode()
+        if content_type.startswith("application/json"):
+            data = json.loads(body)
+            if isinstance(data, dict):
+                data = self.fields(data)
+            return self.text(json.dumps(data, sort_keys=True))
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            fields = self.fields(dict(parse_qsl(body)))
+            return urlencode(sorted((k, self.text(v)) for k, v in fields.items()))
+        return self.text(body)
+
+    def request_key(self, request):
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        auth = f"{scheme} {self.placeholder('token', token)}" if token else ""
+        body = self.body(request.body, request.headers.get("Content-Type", ""))
+        parts = [request.method, self.text(request.path_url), auth, body]
+        return " ".join(part for part in parts if part)
+
+    def response_body(self, text):
+        """Normalize a recorded response: emails and issued access tokens."""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return self.text(text)
+        if isinstance(data, dict) and isinstance(data.get("access_token"), str):
+            data["access_token"] = self.placeholder("token", data["access_token"])
+        return self.text(json.dumps(data))
+
+    def restore(self, text):
+        """Swap this run's values back in for the email and password placeholders."""
+        return PLACEHOLDER.sub(
+            lambda m: self.values.get(m.group(), m.group()) if m.group(1) != "token" else m.group(), text
+        )
+
+
+class Cassette:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.normalizer = Normalizer()
+        self.interactions = []
+        self.index = defaultdict(deque)
+
+    def load(self):
+        with self.path.open(encoding="utf-8") as f:
+            self.interactions = json.load(f)
+        for interaction in self.interactions:
+            self.index[interaction["request"]].append(interaction)
+        return self
+
+    def save(self):
+        if not self.interactions:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w", encoding="utf-8") as f:
+            json.dump(self.interactions, f, separators=(",", ":"))
+
+
+class CassetteAdapter(BaseAdapter):
+    """Records through `inner` (mode 'record') or serves from the cassette ('replay')."""
+
+    def __init__(self, cassette, mode, inner):
+        super().__init__()
+        self.cassette = cassette
+        self.mode = mode
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        key = self.cassette.normalizer.request_key(request)
+        if self.mode == "record":
+            response = self.inner.send(request, **kwargs)
+            self.cassette.interactions.append({
+                "request": key,
+                "status": response.status_code,
+                "content_type": response.headers.get("Content-Type", ""),
+                "body": self.cassette.normalizer.response_body(response.text),
+            })
+            return response
+        recorded = self.cassette.index.get(key)
+        if not recorded:
+            raise CassetteMismatch(
+                f"no recorded response for {key!r} in {self.cassette.path}; "
+                f"re-record with --api-cassettes=record"
+            )
+        return self._build_response(request, recorded.popleft())
+
+    def _build_response(self, request, interaction):
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = reasons.get(interaction["status"], "")
+        response.headers = CaseInsensitiveDict({"Content-Type": interaction["content_type"]})
+        response._content = self.cassette.normalizer.restore(interaction["body"]).encode()
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def cassette_path(directory, nodeid):
+    parts = [re.sub(r"[^\w.\-\[\]]", "_", part) for part in re.split(r"::|/", nodeid.replace(".py::", "::"))]
+    return Path(directory, *parts).with_suffix(".json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api cassettes")
+    group.addoption(
+        "--api-cassettes", choices=("off", "record", "replay"), default="off",
+        help="record each test's API interactions to cassettes, or replay them without the network",
+    )
+    group.addoption(
+        "--cassette-dir", metavar="DIR", default=str(DEFAULT_CASSETTE_DIR),
+        help="where cassettes are stored (default: cassettes/)",
+    )
+
+
+@pytest.fixture(autouse=True)
+def api_cassette(request):
+    """Mount the test's cassette on the shared api session for the duration of the test."""
+    mode = request.config.getoption("api_cassettes")
+    if mode == "off" or "api_backend" not in request.fixturenames or request.node.get_closest_marker("benchmark"):
+        yield None
+        return
+    cassette = Cassette(cassette_path(request.config.getoption("cassette_dir"), request.node.nodeid))
+    if mode == "replay":
+        if not cassette.path.exists():
+            pytest.fail(f"no cassette at {cassette.path}; record one with --api-cassettes=record")
+        cassette.load()
+    adapters = dict(api.adapters)
+    for prefix, inner in adapters.items():
+        api.mount(prefix, CassetteAdapter(cassette, mode, inner))
+    yield cassette
+    for prefix, inner in adapters.items():
+        api.mount(prefix, inner)
+    if mode == "record":
+        cassette.save()
@@ -6,3 +6,9 @@ load_dotenv()
 BASE_URL = "http://localhost:5173"
 SUPERUSER_EMAIL = os.getenv("FIRST_SUPERUSER", "admin@example.com")
 SUPERUSER_PASSWORD = os.getenv("FIRST_SUPERUSER_PASSWORD", "changethis")
+WORKER_ID = os.getenv("PYTEST_XDIST_WORKER", "main")
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+API_BACKEND = os.getenv("API_BACKEND", "real")
+TEST_SEED = os.getenv("TEST_SEED")
+TEST_RUN_SALT = os.getenv("TEST_RUN_SALT")
+FRONTEND_BUILD_ID = os.getenv("FRONTEND_BUILD_ID")
@@ -3,12 +3,48 @@ import os
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
+from browser_contexts import BrowserContext, WindowContext, context_key
 
-@pytest.fixture(scope="function")
-def driver():
+pytest_plugins = [
+    "tracing",
+    "adaptive_waits",
+    "api_helpers",
+    "latency_budgets",
+    "page_metrics",
+    "network_audit",
+    "stub_backend",
+    "cassettes",
+    "network_filter",
+    "browser_cache",
+    "warmup",
+    "user_pool",
+    "read_only",
+    "scheduler",
+    "impact_map",
+    "result_cache",
+    "bench",
+    "soak",
+    "results_stream",
+]
+
+
+def pytest_addhooks(pluginmanager):
+    import hookspecs
+    pluginmanager.add_hookspecs(hookspecs)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--shared-browser", action="store_true", default=False,
+        help="run UI tests in isolated contexts of one Chrome per pytest process instead of one Chrome per test",
+    )
+
+
+def start_chrome(request):
     options = webdriver.ChromeOptions()
     # options.add_argument("--headless")
     options.add_argument("--start-maximized")
+    request.config.hook.pytest_driver_options(options=options, request=request)
     
     # Fix for macOS ARM64 ChromeDriver issue
     try:
@@ -41,5 +77,67 @@ def driver():
             print(f"Fallback also failed: {fallback_error}")
             raise
     
+    request.config.hook.pytest_driver_created(driver=driver, request=request)
+    return driver
+
+
+@pytest.fixture(scope="session")
+def browser_factory():
+    """start_chrome, for fixtures that manage a browser of their own."""
+    return start_chrome
+
+
+@pytest.fixture(scope="session")
+def shared_browser(request):
+    """One Chrome for the whole pytest process, used by --shared-browser."""
+    browser = start_chrome(request)
+    yield browser
+    browser.quit()
+
+
+def open_context(browser, request):
+    """A new isolated context in `browser` for the test of `request`, with the per-context hooks run."""
+    context = BrowserContext(browser)
+    request.config.hook.pytest_driver_context_created(driver=browser, context=context, request=request)
+    return context
+
+
+@pytest.fixture(scope="function")
+def driver(request):
+    if request.node.get_closest_marker("read_only"):
+        driver = request.getfixturevalue("read_only_driver")
+        request.node.stash[context_key] = WindowContext(driver)
+        yield driver
+        return
+    if request.config.getoption("shared_browser"):
+        context = open_context(request.getfixturevalue("shared_browser"), request)
+        request.node.stash[context_key] = context
+        yield context.driver
+        context.close()
+        return
+    driver = start_chrome(request)
+    request.node.stash[context_key] = WindowContext(driver)
     yield driver
     driver.quit()
+
+
+@pytest.fixture
+def browser_context(request, driver):
+    """The context `driver` was opened in; `browser_context.activate()` switches back to it."""
+    return request.node.stash[context_key]
+
+
+@pytest.fixture
+def new_browser_context(request, driver, browser_context):
+    """Factory for extra isolated contexts (own cookies and storage) in the test's browser."""
+    contexts = []
+
+    def factory():
+        context = open_context(driver, request)
+        contexts.append(context)
+        return context
+
+    yield factory
+    for context in reversed(contexts):
+        context.close()
+    browser_context.activate()
@@ -0,0 +1,245 @@
+"""
+Seeded bulk data for scaling runs.
+
+`DataGenerator(seed)` streams users and items lazily, so a million records never
+sit in memory, and the same seed always yields the same records in the same
+order. Titles and descriptions follow log-normal length distributions, which is
+what real free text looks like: mostly short, with a long tail, capped at the
+backend's 255-character limit.
+
+`load()` pushes any stream of records into the backend through a callable with a
+bounded number of requests in flight, printing progress as it goes, and
+`BackendLoader` supplies those callables for users and items. From the shell:
+
+    python datagen.py users 100000 --seed 1 --out users.jsonl
+    python datagen.py load-users 100000 --seed 1 --concurrency 64
+    python datagen.py load-items 1000000 --seed 1 --owners 100 --concurrency 64
+    python datagen.py load-users --in users.jsonl --concurrency 64
+
+Items are owned by the superuser unless --owners N spreads them over the first N
+generated users (who must have been loaded with the same seed). With --in the
+records come from a JSONL file written earlier instead of the generator, and
+`count`, if given, caps how many are loaded.
+
+Setting TEST_SEED also makes the values from helpers.random_string/random_email
+and api_helpers.random_lower_string/random_email reproducible: two runs with the
+same seed get the same data. A rerun against a backend that still has the last
+run's users would sign up addresses that already exist; set TEST_RUN_SALT to a
+new value for it and the emails carry that salt, leaving everything else as the
+seed made it.
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import API_BASE_URL, SUPERUSER_EMAIL, SUPERUSER_PASSWORD, TEST_RUN_SALT, TEST_SEED, WORKER_ID
+
+API_V1_STR = "/api/v1"
+MAX_TEXT = 255
+
+WORDS = (
+    "alpha bravo cargo delta engine filter garden harbor index jacket kernel ladder market "
+    "nickel orbit packet quartz ribbon signal tablet update vector window yellow zone account "
+    "budget client design export folder invoice ledger meeting report review sample ticket"
+).split()
+
+
+RUN_SALT = f".{TEST_RUN_SALT}" if TEST_RUN_SALT else ""
+
+
+def seeded_random(name):
+    """
+    RNG for the test helpers' random values. With TEST_SEED set it is seeded from
+    the seed, `name` and the xdist worker, so reruns repeat the same values while
+    parallel workers still don't collide; otherwise it is seeded from the OS.
+    """
+    if TEST_SEED is None:
+        return random.Random()
+    return random.Random(f"{TEST_SEED}:{name}:{WORKER_ID}")
+
+
+class DataGenerator:
+    """Deterministic streams of users and items; each kind has its own seeded RNG."""
+
+    def __init__(self, seed=0, title_words=(1.2, 0.5), description_words=(2.5, 0.9)):
+        self.seed = seed
+        self.title_words = title_words
+        self.description_words = description_words
+
+    def _rng(self, kind):
+        return random.Random(f"{self.seed}:{kind}")
+
+    def _text(self, rng, mu, sigma):
+        count = max(1, round(rng.lognormvariate(mu, sigma)))
+        return " ".join(rng.choice(WORDS) for _ in range(count))[:MAX_TEXT]
+
+    def users(self, count=None):
+        """Users with unique emails, in a fixed order; `count=None` streams forever."""
+        rng = self._rng("users")
+        i = 0
+        while count is None or i < count:
+            yield {
+                "email": f"user{i:07d}.{self.seed}@datagen.example.com",
+                "password": "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(12)),
+                "full_name": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            }
+            i += 1
+
+    def items(self, count=None, owners=0):
+        """Items; with `owners`, each names the index of the generated user that owns it."""
+        rng = self._rng("items")
+        i = 0
+        while count is None or i < count:
+            item = {
+                "title": self._text(rng, *self.title_words),
+                "description": self._text(rng, *self.description_words),
+            }
+            if owners:
+                item["owner"] = rng.randrange(owners)
+            yield item
+            i += 1
+
+
+def write_jsonl(records, path):
+    """Stream `records` to `path`, one JSON object per line; returns how many were written."""
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            n += 1
+    return n
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load(records, send, concurrency=32, label="records", report_every=5.0, out=sys.stderr):
+    """
+    Call `send(record)` for every record with at most `concurrency` calls in flight.
+
+    Records are pulled from the iterable only as slots free up. Returns a dict
+    with the counts of sent and failed records, the elapsed time and the rate.
+    """
+    sent = failed = 0
+    first_error = None
+    start = last_report = time.perf_counter()
+    records = iter(records)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(send, record))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    sent += 1
+                else:
+                    failed += 1
+                    first_error = first_error or error
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f"{label}: {sent} loaded, {failed} failed, {sent / (now - start):.0f}/s", file=out, flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {sent} loaded, {failed} failed in {elapsed:.1f}s", file=out, flush=True)
+    if first_error is not None:
+        print(f"{label}: first error: {first_error}", file=out, flush=True)
+    return {"sent": sent, "failed": failed, "elapsed_s": elapsed, "per_s": sent / elapsed if elapsed else 0.0}
+
+
+class BackendLoader:
+    """Senders for `load()` that create users and items through the API."""
+
+    def __init__(self, base_url=API_BASE_URL, concurrency=32):
+        self.root = f"{base_url}{API_V1_STR}"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.superuser = self.login(SUPERUSER_EMAIL, SUPERUSER_PASSWORD)
+        self.owner_headers = []
+
+    def login(self, email, password):
+        response = self.session.post(f"{self.root}/login/access-token", data={"username": email, "password": password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def login_owners(self, users):
+        """Log in the generated users that items may be assigned to, in generation order."""
+        self.owner_headers = [self.login(user["email"], user["password"]) for user in users]
+
+    def create_user(self, user):
+        response = self.session.post(f"{self.root}/users/", headers=self.superuser, json=user)
+        response.raise_for_status()
+        return response.json()
+
+    def delete_user(self, user_id):
+        response = self.session.delete(f"{self.root}/users/{user_id}", headers=self.superuser)
+        response.raise_for_status()
+
+    def create_item(self, item):
+        owner = item.get("owner")
+        headers = self.owner_headers[owner] if owner is not None else self.superuser
+        payload = {"title": item["title"], "description": item["description"]}
+        response = self.session.post(f"{self.root}/items/", headers=headers, json=payload)
+        response.raise_for_status()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and load seeded test data.")
+    parser.add_argument("command", choices=("users", "items", "load-users", "load-items"))
+    parser.add_argument("count", type=int, nargs="?", help="records to generate, or at most to load with --in")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--owners", type=int, default=0, help="spread items over the first N generated users")
+    parser.add_argument("--out", help="JSONL file to write (users/items); default stdout")
+    parser.add_argument("--in", dest="in_path", help="JSONL file to load (load-users/load-items) instead of generating")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--base-url", default=API_BASE_URL)
+    args = parser.parse_args(argv)
+    if args.in_path and args.command not in ("load-users", "load-items"):
+        parser.error("--in only applies to load-users and load-items")
+    if args.count is None and not args.in_path:
+        parser.error("count is required unless records come from --in")
+
+    generator = DataGenerator(args.seed)
+    if args.command in ("users", "items"):
+        records = generator.users(args.count) if args.command == "users" else generator.items(args.count, args.owners)
+        if args.out:
+            write_jsonl(records, args.out)
+        else:
+            for record in records:
+                sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return 0
+    loader = BackendLoader(args.base_url, args.concurrency)
+    if args.command == "load-items":
+        loader.login_owners(generator.users(args.owners))
+    if args.in_path:
+        records = itertools.islice(read_jsonl(args.in_path), args.count)
+    elif args.command == "load-users":
+        records = generator.users(args.count)
+    else:
+        records = generator.items(args.count, args.owners)
+    send = loader.create_user if args.command == "load-users" else loader.create_item
+    stats = load(records, send, args.concurrency, label=args.command.split("-")[1])
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+from functools import wraps
+
+
+def add_command_hook(driver, hook):
+    """
+    Wrap every WebDriver command issued by `driver` with `hook`.
+
+    The hook is called as hook(driver, command, params, execute) and must return
+    execute(command, params) (or raise). Hooks stack: the most recently added one
+    runs outermost. Commands issued from inside a hook go through the whole chain.
+    """
+    execute = driver.execute
+
+    @wraps(execute)
+    def hooked_execute(driver_command, params=None):
+        return hook(driver, driver_command, params, execute)
+
+    driver.execute = hooked_execute
+    return driver
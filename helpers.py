@@ -1,17 +1,54 @@
-import random
 import string
 import time
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from config import SUPERUSER_EMAIL, SUPERUSER_PASSWORD, BASE_URL
 from locators import Auth, Navbar, Dashboard, General
+from tracing import traced
+from adaptive_waits import wait_until
+from datagen import RUN_SALT, seeded_random
+
+_random = seeded_random("helpers")
+
+# Sets each value through the native setter so React sees the change, then fires
+# the events react-hook-form listens for. Returns the indexes it could not find.
+_FILL_FORM_SCRIPT = """
+const missing = [];
+arguments[0].forEach(([strategy, selector, value], i) => {
+    const el = strategy === 'xpath'
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    if (!el) { missing.push(i); return; }
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.dispatchEvent(new FocusEvent('focusout', {bubbles: true}));
+    el.dispatchEvent(new FocusEvent('blur'));
+});
+return missing;
+"""
+
+def _script_locator(locator):
+    by, value = locator
+    if by == By.XPATH:
+        return "xpath", value
+    if by == By.CSS_SELECTOR:
+        return "css", value
+    if by == By.NAME:
+        return "css", f'[name="{value}"]'
+    if by == By.ID:
+        return "css", f'[id="{value}"]'
+    raise ValueError(f"fill_form cannot resolve {by!r} locators in a script")
 
 def random_string(length=8):
-    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
+    return ''.join(_random.choices(string.ascii_lowercase + string.digits, k=length))
 
 def random_email():
-    return f"test_{random_string()}@example.com"
+    return f"test_{random_string()}{RUN_SALT}@example.com"
 
+@traced
 def login(driver, email, password, expect_success=True):
     driver.get(f"{BASE_URL}/login")
     wait_for(driver, Auth.EMAIL_INPUT).send_keys(email)
@@ -21,10 +58,12 @@ def login(driver, email, password, expect_success=True):
         wait_for_url_to_be(driver, f"{BASE_URL}/")
         wait_for(driver, Dashboard.WELCOME_TEXT)
 
+@traced
 def login_as_superuser(driver):
     login(driver, SUPERUSER_EMAIL, SUPERUSER_PASSWORD)
     wait_for(driver, Dashboard.WELCOME_TEXT)
 
+@traced
 def logout(driver):
     try:
         user_menu = wait_for(driver, Navbar.USER_MENU)
@@ -42,22 +81,64 @@ def logout(driver):
         raise
     wait_for_url_to_be(driver, f"{BASE_URL}/login")
 
-def wait_for(driver, locator, timeout=10):
-    return WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(locator))
+def table_row(text):
+    return (By.XPATH, f"//tr[td[contains(text(), '{text}')]]")
+
+@traced
+def open_row_menu(driver, text):
+    """Page forward through the table until a row containing `text` shows, then open its actions menu."""
+    while not driver.find_elements(*table_row(text)):
+        next_button = wait_for(driver, General.NEXT_PAGE_BUTTON)
+        if not next_button.is_enabled():
+            break
+        next_button.click()
+        wait_for_toast_to_disappear(driver)
+    wait_for(driver, table_row(text)).find_element(*General.ROW_ACTIONS_BUTTON).click()
+
+@traced
+def fill_form(driver, fields, typed=(), timeout=None):
+    """
+    Fill a form from a {locator: value} dict in one script call.
+
+    Waits once for the first field, sets every value and dispatches the input,
+    change and blur events the React forms listen for. Locators listed in
+    `typed` are typed with send_keys instead, for fields that need real key events.
+    """
+    wait_for(driver, next(iter(fields)), timeout)
+    scripted = [(locator, value) for locator, value in fields.items() if locator not in typed]
+    if scripted:
+        missing = driver.execute_script(
+            _FILL_FORM_SCRIPT, [[*_script_locator(locator), value] for locator, value in scripted]
+        )
+        if missing:
+            raise NoSuchElementException(f"fill_form could not find {[scripted[i][0] for i in missing]}")
+    for locator in typed:
+        element = wait_for(driver, locator, timeout)
+        element.clear()
+        element.send_keys(fields[locator])
+
+@traced
+def wait_for(driver, locator, timeout=None):
+    return wait_until(driver, EC.visibility_of_element_located(locator), "visible", locator, timeout)
 
-def wait_for_all(driver, locator, timeout=10):
-    return WebDriverWait(driver, timeout).until(EC.visibility_of_all_elements_located(locator))
+@traced
+def wait_for_all(driver, locator, timeout=None):
+    return wait_until(driver, EC.visibility_of_all_elements_located(locator), "all visible", locator, timeout)
 
-def wait_for_url_to_be(driver, url, timeout=10):
-    WebDriverWait(driver, timeout).until(EC.url_to_be(url))
+@traced
+def wait_for_url_to_be(driver, url, timeout=None):
+    wait_until(driver, EC.url_to_be(url), "url", url, timeout)
 
-def wait_for_text(driver, locator, text, timeout=10):
-    WebDriverWait(driver, timeout).until(EC.text_to_be_present_in_element(locator, text))
+@traced
+def wait_for_text(driver, locator, text, timeout=None):
+    wait_until(driver, EC.text_to_be_present_in_element(locator, text), "text", locator, timeout)
 
-def wait_for_invisibility(driver, locator, timeout=10):
-    return WebDriverWait(driver, timeout).until(EC.invisibility_of_element_located(locator))
+@traced
+def wait_for_invisibility(driver, locator, timeout=None):
+    return wait_until(driver, EC.invisibility_of_element_located(locator), "invisible", locator, timeout)
 
-def wait_for_toast_to_disappear(driver, timeout=10):
+@traced
+def wait_for_toast_to_disappear(driver, timeout=None):
     # Wait for both success and error toasts to disappear
     try:
         wait_for_invisibility(driver, General.TOAST_SUCCESS, timeout)
@@ -0,0 +1,21 @@
+"""Hooks the `driver` fixture calls so plugins can configure and instrument browsers."""
+import pytest
+
+
+@pytest.hookspec
+def pytest_driver_options(options, request):
+    """Called with the ChromeOptions before each WebDriver is started."""
+
+
+@pytest.hookspec
+def pytest_driver_created(driver, request):
+    """Called with each new WebDriver before the test receives it."""
+
+
+@pytest.hookspec
+def pytest_driver_context_created(driver, context, request):
+    """
+    Called when a test opens a new isolated BrowserContext in an already running
+    browser (--shared-browser, new_browser_context), with the test's own request,
+    after the driver has switched to the context's window.
+    """
@@ -0,0 +1,231 @@
+"""
+Which frontend routes and backend endpoints each test touches.
+
+With `--record-impact`, every test's browser traffic (pages navigated to, API
+requests the frontend made) and the calls it made through api_helpers are
+recorded and merged into impact_map.json: per test, the routes visited
+("/items") and the endpoints hit ("GET /items/{id}"). Tests that did not run keep
+their previous entry.
+
+Traffic is attributed to whatever is running on the test thread: a test, or a
+fixture being set up. What a fixture touches while it is set up (the read-only
+page's login, say) is remembered and added to every test that requests the
+fixture, so a module- or session-scoped fixture counts for all of its tests, not
+just the one that happened to set it up. Calls from other threads, such as the
+user pool's background refills, are ignored; calls a test relies on without
+sending them (a pooled user's signup, the pre-minted superuser login) are noted
+by api_helpers and count as the test's own. Recording needs live API calls, so
+it cannot be combined with `--api-cassettes=replay`.
+
+`--changed=/items,PUT /items/{id}` then runs only the tests whose recorded routes
+or endpoints match one of the changed entries (fnmatch patterns such as
+"* /users/*" work too). Tests that have no entry in the map always run, so a new
+test is never skipped before it has been recorded.
+"""
+import fnmatch
+import json
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from api_helpers import endpoint_log, endpoint_of
+from driver_hooks import add_command_hook
+from network_log import enable_performance_log, is_api_request, network_log
+
+DEFAULT_MAP_FILE = Path(__file__).parent / "impact_map.json"
+
+TEST_THREAD = "MainThread"
+
+touched = {}
+fixture_touched = {}
+_live_drivers = []
+# What traffic is attributed to right now: the running test's entry, plus the
+# entries of the fixtures being set up (nested fixtures stack).
+_active = []
+_cursor = {"endpoints": 0}
+
+
+def _entry(table, key):
+    return table.setdefault(key, {"routes": set(), "endpoints": set()})
+
+
+def _touch(nodeid, routes=(), endpoints=()):
+    entry = _entry(touched, nodeid)
+    entry["routes"].update(routes)
+    entry["endpoints"].update(endpoints)
+
+
+def _attribute(routes=(), endpoints=()):
+    routes, endpoints = set(routes), set(endpoints)
+    for entry in _active:
+        entry["routes"].update(routes)
+        entry["endpoints"].update(endpoints)
+
+
+def _drain(driver):
+    """Attribute the browser traffic since the last drain to what is running now."""
+    log = network_log(driver)
+    log.poll()
+    cursors = driver._impact_cursors
+    requests, navigations = log.requests[cursors[0]:], log.navigations[cursors[1]:]
+    driver._impact_cursors = (len(log.requests), len(log.navigations))
+    _attribute(
+        routes=(urlsplit(url).path or "/" for url in navigations if urlsplit(url).scheme in ("http", "https")),
+        endpoints=(endpoint_of(r["method"], r["url"]) for r in requests if is_api_request(r)),
+    )
+
+
+def _collect():
+    """Attribute everything since the last collection: browser traffic and test-thread API calls."""
+    for driver in list(_live_drivers):
+        try:
+            _drain(driver)
+        except WebDriverException:
+            pass
+    new, _cursor["endpoints"] = endpoint_log[_cursor["endpoints"]:], len(endpoint_log)
+    _attribute(endpoints=(endpoint for thread, endpoint in new if thread == TEST_THREAD))
+
+
+def load_map(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)["tests"]
+
+
+def affected(entry, changed):
+    return any(
+        fnmatch.fnmatchcase(touched_item, pattern)
+        for pattern in changed
+        for touched_item in (*entry["routes"], *entry["endpoints"])
+    )
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("impact map")
+    group.addoption(
+        "--record-impact", action="store_true", default=False,
+        help="record the routes and endpoints each test touches into the impact map",
+    )
+    group.addoption(
+        "--impact-map", metavar="PATH", default=str(DEFAULT_MAP_FILE),
+        help="impact map file (default: impact_map.json)",
+    )
+    group.addoption(
+        "--changed", metavar="LIST", default=None,
+        help="comma-separated routes and endpoints that changed, e.g. '/items,PUT /items/{id}'; "
+             "run only the tests that touch them (and tests not yet in the map)",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("record_impact") and config.getoption("api_cassettes") == "replay":
+        raise pytest.UsageError("--record-impact needs live API calls and cannot be used with --api-cassettes=replay")
+
+
+def pytest_collection_modifyitems(config, items):
+    changed = config.getoption("changed")
+    if not changed:
+        return
+    changed = [entry.strip() for entry in changed.split(",") if entry.strip()]
+    impact = load_map(config.getoption("impact_map"))
+    selected, deselected = [], []
+    for item in items:
+        entry = impact.get(item.nodeid)
+        (selected if entry is None or affected(entry, changed) else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def pytest_driver_options(options, request):
+    if request.config.getoption("record_impact"):
+        enable_performance_log(options)
+
+
+def pytest_driver_created(driver, request):
+    if not request.config.getoption("record_impact"):
+        return
+    driver._impact_cursors = (0, 0)
+    _live_drivers.append(driver)
+
+    def hook(driver, command, params, execute):
+        if command == Command.QUIT:
+            _drain(driver)
+            _live_drivers.remove(driver)
+        return execute(command, params)
+
+    add_command_hook(driver, hook)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if not request.config.getoption("record_impact"):
+        yield
+        return
+    _collect()
+    # Function-scoped fixtures are set up inside their test, which already gets the traffic.
+    shared = fixturedef.scope != "function"
+    if shared:
+        _active.append(_entry(fixture_touched, fixturedef.argname))
+    try:
+        yield
+    finally:
+        _collect()
+        if shared:
+            _active.pop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    if not item.config.getoption("record_impact"):
+        yield
+        return
+    _collect()
+    _active[:] = [_entry(touched, item.nodeid)]
+    yield
+    _collect()
+    _active.clear()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    # Before fixtures are torn down, so drivers quitting now are already drained.
+    if not item.config.getoption("record_impact"):
+        return
+    _collect()
+    # The request's names include fixtures pulled in with getfixturevalue (read_only_driver).
+    request = getattr(item, "_request", None)
+    for name in request.fixturenames if request else item.fixturenames:
+        if name in fixture_touched:
+            _touch(item.nodeid, **fixture_touched[name])
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for nodeid, entry in getattr(node, "workeroutput", {}).get("impact_map", {}).items():
+        _touch(nodeid, entry["routes"], entry["endpoints"])
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("record_impact"):
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["impact_map"] = {
+            nodeid: {"routes": sorted(e["routes"]), "endpoints": sorted(e["endpoints"])}
+            for nodeid, e in touched.items()
+        }
+        return
+    if not touched:
+        return
+    path = Path(config.getoption("impact_map"))
+    impact = load_map(path)
+    for nodeid, entry in touched.items():
+        impact[nodeid] = {"routes": sorted(entry["routes"]), "endpoints": sorted(entry["endpoints"])}
+    with path.open("w", encoding="utf-8") as f:
+        json.dump({"tests": dict(sorted(impact.items()))}, f, indent=2)
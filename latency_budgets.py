@@ -0,0 +1,93 @@
+"""
+Latency budgets for the backend API.
+
+Budgets live in latency_budgets.json as p95 and max thresholds (ms) per endpoint,
+keyed the same way the API timing summary is ("GET /items/{id}"), with a default
+for endpoints that are not listed. At the end of the session every endpoint's
+samples from the whole run are checked against its budget. p95 is only judged
+once an endpoint has `min_samples_for_p95` calls; max is always judged.
+
+`--latency-budgets=warn` (the default) reports violations, `fail` also fails the
+run, `off` skips the check.
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+from api_helpers import api_timings
+from stats import percentile
+
+DEFAULT_BUDGET_FILE = Path(__file__).parent / "latency_budgets.json"
+
+violations = []
+
+
+def load_budgets(path):
+    with open(path, encoding="utf-8") as f:
+        budgets = json.load(f)
+    budgets.setdefault("endpoints", {})
+    budgets.setdefault("min_samples_for_p95", 5)
+    return budgets
+
+
+def check_budgets(samples, budgets):
+    """Return one violation dict per exceeded threshold, over all samples per endpoint."""
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample["endpoint"]].append(sample["total_ms"])
+    found = []
+    for endpoint, latencies in sorted(by_endpoint.items()):
+        budget = budgets["endpoints"].get(endpoint, budgets.get("default"))
+        if not budget:
+            continue
+        measured = {"max_ms": max(latencies)}
+        if len(latencies) >= budgets["min_samples_for_p95"]:
+            measured["p95_ms"] = percentile(latencies, 95)
+        for metric, value in measured.items():
+            limit = budget.get(metric)
+            if limit is not None and value > limit:
+                found.append({
+                    "endpoint": endpoint,
+                    "metric": metric,
+                    "measured_ms": value,
+                    "budget_ms": limit,
+                    "samples": len(latencies),
+                })
+    return found
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("latency budgets")
+    group.addoption(
+        "--latency-budgets", choices=("off", "warn", "fail"), default="warn",
+        help="check API latencies against the budget file at session end (default: warn)",
+    )
+    group.addoption(
+        "--latency-budget-file", metavar="PATH", default=str(DEFAULT_BUDGET_FILE),
+        help="budget file to check against (default: latency_budgets.json)",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session):
+    config = session.config
+    mode = config.getoption("latency_budgets")
+    if mode == "off" or hasattr(config, "workeroutput") or not api_timings:
+        return
+    violations[:] = check_budgets(api_timings, load_budgets(config.getoption("latency_budget_file")))
+    if violations and mode == "fail" and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not violations:
+        return
+    mode = config.getoption("latency_budgets")
+    terminalreporter.write_sep("=", f"latency budget violations ({mode})", red=mode == "fail", yellow=mode == "warn")
+    for v in violations:
+        terminalreporter.write_line(
+            f"{v['endpoint']}: {v['metric'][:-3]} {v['measured_ms']:.1f}ms > budget {v['budget_ms']}ms "
+            f"over {v['samples']} calls"
+        )
@@ -19,6 +19,8 @@ class General:
     TOAST_ERROR_TITLE = (By.XPATH, "//*[contains(text(), 'Something went wrong!')]")
     TOAST_ERROR_DESCRIPTION = (By.CSS_SELECTOR, "[data-part='description']")
     DIALOG_TITLE = (By.CSS_SELECTOR, "[data-part='title']")
+    ROW_ACTIONS_BUTTON = (By.CSS_SELECTOR, "td:last-child button")
+    NEXT_PAGE_BUTTON = (By.XPATH, "//button[@aria-label='next page']")
 
 class Navbar:
     USER_MENU = (By.CSS_SELECTOR, '[data-testid="user-menu"]')
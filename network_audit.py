@@ -0,0 +1,225 @@
+"""
+Backend requests issued by the frontend, per UI action.
+
+With `--network-audit=warn|fail` every browser records its network traffic and
+each test is split into actions: a `driver.get` ("navigate /admin") or an element
+click ("click <locator> on /items"), where the locator is the one the clicked
+element was found with. The API requests made between one action and the next
+are grouped by endpoint and checked against network_budgets.json: total request
+count, duplicate requests (same method and URL more than once) and N+1 patterns
+(one endpoint template hit for many different ids). Budgets are matched by
+fnmatch pattern on the action label. In fail mode a test whose actions exceed
+their budget fails.
+
+Actions are filed under the test that is running when they happen, not the one
+that started the browser, so tests on a shared browser (--shared-browser) or the
+read-only page are audited one by one like any other.
+"""
+import fnmatch
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.webdriver.remote.command import Command
+
+from api_helpers import endpoint_of
+from driver_hooks import add_command_hook
+from network_log import enable_performance_log, is_api_request, network_log
+
+DEFAULT_BUDGET_FILE = Path(__file__).parent / "network_budgets.json"
+
+actions = []
+test_actions = defaultdict(list)
+_live_recorders = []
+_current = {"nodeid": None}
+
+
+def load_budgets(path):
+    with open(path, encoding="utf-8") as f:
+        budgets = json.load(f)
+    budgets.setdefault("actions", {})
+    return budgets
+
+
+def budget_for(label, budgets):
+    for pattern, budget in budgets["actions"].items():
+        if fnmatch.fnmatchcase(label, pattern):
+            return {**budgets.get("default", {}), **budget}
+    return budgets.get("default", {})
+
+
+def analyze(label, requests, budget):
+    """Group an action's API requests by endpoint and flag what exceeds `budget`."""
+    endpoints = Counter(endpoint_of(r["method"], r["url"]) for r in requests)
+    duplicates = {
+        key: n for key, n in Counter(f"{r['method']} {r['url']}" for r in requests).items() if n > 1
+    }
+    ids_per_endpoint = defaultdict(set)
+    for r in requests:
+        endpoint = endpoint_of(r["method"], r["url"])
+        if "{id}" in endpoint:
+            ids_per_endpoint[endpoint].add(urlsplit(r["url"]).path)
+    n_plus_one = {
+        endpoint: len(ids) for endpoint, ids in ids_per_endpoint.items()
+        if len(ids) >= budget.get("n_plus_one", float("inf"))
+    }
+    problems = []
+    if len(requests) > budget.get("max_requests", float("inf")):
+        problems.append(f"{len(requests)} API requests > budget {budget['max_requests']}")
+    if sum(n - 1 for n in duplicates.values()) > budget.get("max_duplicates", float("inf")):
+        problems.extend(f"duplicate {key} x{n}" for key, n in duplicates.items())
+    problems.extend(f"N+1: {endpoint} for {n} ids" for endpoint, n in n_plus_one.items())
+    return {
+        "action": label,
+        "requests": len(requests),
+        "endpoints": dict(endpoints),
+        "duplicates": duplicates,
+        "n_plus_one": n_plus_one,
+        "problems": problems,
+    }
+
+
+class ActionRecorder:
+    """Splits one driver's traffic into actions and analyzes each as it closes."""
+
+    def __init__(self, driver, budgets):
+        self.log = network_log(driver)
+        self.budgets = budgets
+        self.label = None
+        self.nodeid = None
+        self.cursor = 0
+        self.locators = {}
+
+    def start(self, label):
+        self.close()
+        self.label = label
+        self.nodeid = _current["nodeid"]
+
+    def close(self):
+        self.log.poll()
+        new = self.log.requests[self.cursor:]
+        self.cursor = len(self.log.requests)
+        if self.label is None:
+            return
+        result = analyze(self.label, [r for r in new if is_api_request(r)], budget_for(self.label, self.budgets))
+        result["test"] = self.nodeid
+        test_actions[self.nodeid].append(result)
+        actions.append(result)
+        self.label = None
+
+    def remember_locator(self, params, response):
+        elements = response.get("value")
+        if isinstance(elements, dict):
+            elements = [elements]
+        for element in elements or []:
+            for element_id in element.values():
+                self.locators[element_id] = params["value"]
+
+
+def pytest_driver_options(options, request):
+    if request.config.getoption("network_audit") != "off":
+        enable_performance_log(options)
+
+
+def pytest_driver_created(driver, request):
+    if request.config.getoption("network_audit") == "off":
+        return
+    recorder = ActionRecorder(driver, load_budgets(request.config.getoption("network_budget_file")))
+    _live_recorders.append(recorder)
+
+    def hook(driver, command, params, execute):
+        if command == Command.GET:
+            recorder.start(f"navigate {urlsplit(params['url']).path or '/'}")
+        elif command == Command.CLICK_ELEMENT:
+            recorder.close()
+            locator = recorder.locators.get(params["id"], "element")
+            recorder.start(f"click {locator} on {recorder.log.current_route()}")
+        elif command == Command.QUIT:
+            recorder.close()
+            _live_recorders.remove(recorder)
+        response = execute(command, params)
+        if command in (Command.FIND_ELEMENT, Command.FIND_ELEMENTS):
+            recorder.remember_locator(params, response)
+        return response
+
+    add_command_hook(driver, hook)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("network audit")
+    group.addoption(
+        "--network-audit", choices=("off", "warn", "fail"), default="off",
+        help="count the frontend's API requests per UI action and check them against the budgets",
+    )
+    group.addoption(
+        "--network-budget-file", metavar="PATH", default=str(DEFAULT_BUDGET_FILE),
+        help="per-action request budgets (default: network_budgets.json)",
+    )
+    group.addoption(
+        "--network-audit-json", metavar="PATH", default=None,
+        help="write every analyzed action as JSON to PATH",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    _current["nodeid"] = item.nodeid
+    yield
+    _current["nodeid"] = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when != "call" or item.config.getoption("network_audit") == "off":
+        return
+    # The test's last action ends with the test, also on a browser that outlives it.
+    for recorder in _live_recorders:
+        recorder.close()
+    problems = [f"{r['action']}: {p}" for r in test_actions.get(item.nodeid, []) for p in r["problems"]]
+    if problems and report.passed and item.config.getoption("network_audit") == "fail":
+        report.outcome = "failed"
+        report.longrepr = "Network budget exceeded:\n" + "\n".join(problems)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    actions.extend(getattr(node, "workeroutput", {}).get("network_actions", []))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if config.getoption("network_audit") == "off":
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["network_actions"] = actions
+        return
+    path = config.getoption("network_audit_json")
+    if path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(actions, f, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if config.getoption("network_audit") == "off" or hasattr(config, "workeroutput") or not actions:
+        return
+    by_action = defaultdict(list)
+    for result in actions:
+        by_action[result["action"]].append(result)
+    terminalreporter.write_sep("-", "frontend API requests per UI action")
+    terminalreporter.write_line(f"{'action':<72} {'runs':>4} {'mean':>6} {'max':>4}  flagged")
+    for label, results in sorted(by_action.items()):
+        counts = [r["requests"] for r in results]
+        flagged = sum(1 for r in results if r["problems"])
+        terminalreporter.write_line(
+            f"{label[:72]:<72} {len(results):>4} {sum(counts) / len(counts):>6.1f} {max(counts):>4}  "
+            f"{flagged or ''}"
+        )
+    for result in actions:
+        for problem in result["problems"]:
+            terminalreporter.write_line(f"{result['test']} {result['action']}: {problem}", yellow=True)
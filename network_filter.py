@@ -0,0 +1,78 @@
+"""
+Request blocking for UI tests.
+
+Every driver gets the filter in network_filter.json applied over CDP before the
+test starts: URLs matching `block_url_patterns` (Network.setBlockedURLs
+wildcards) fail immediately instead of being downloaded, and each
+`block_resource_types` entry blocks the file extensions of that type. The
+classic CDP bridge has no event stream, so responses cannot be stubbed by
+interception; `stub_scripts` instead run before any page script
+(Page.addScriptToEvaluateOnNewDocument) to define no-op stand-ins for the
+globals blocked third-party scripts would have provided.
+
+The blocklist and scripts are per CDP target, so they are applied to each new
+Chrome and again to every isolated context a test opens in a running one
+(--shared-browser, new_browser_context), each time against the test's own
+request. Tests marked `full_fidelity` (e.g. visual snapshots) therefore get an
+unfiltered window in either mode; `--no-network-filter` turns filtering off for
+the whole run. A filter that cannot be applied is reported as a warning.
+"""
+import json
+import warnings
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+DEFAULT_FILTER_FILE = Path(__file__).parent / "network_filter.json"
+
+RESOURCE_TYPE_PATTERNS = {
+    "Font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "Image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg"],
+    "Media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav"],
+    "SourceMap": ["*.map"],
+}
+
+
+def load_filter(path):
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    patterns = list(spec.get("block_url_patterns", []))
+    for resource_type in spec.get("block_resource_types", []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    return sorted(set(patterns)), spec.get("stub_scripts", [])
+
+
+def apply_filter(driver, patterns, stub_scripts):
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        for source in stub_scripts:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    except WebDriverException as e:
+        warnings.warn(f"could not apply the network filter, assets are not blocked: {e}")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("network filter")
+    group.addoption(
+        "--no-network-filter", action="store_true", default=False,
+        help="load every asset in UI tests instead of blocking the ones listed in the filter file",
+    )
+    group.addoption(
+        "--network-filter-file", metavar="PATH", default=str(DEFAULT_FILTER_FILE),
+        help="URL patterns, resource types and stub scripts to apply (default: network_filter.json)",
+    )
+
+
+def _filter_for(driver, request):
+    if request.config.getoption("no_network_filter") or request.node.get_closest_marker("full_fidelity"):
+        return
+    apply_filter(driver, *load_filter(request.config.getoption("network_filter_file")))
+
+
+def pytest_driver_created(driver, request):
+    _filter_for(driver, request)
+
+
+def pytest_driver_context_created(driver, context, request):
+    _filter_for(driver, request)
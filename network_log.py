@@ -0,0 +1,68 @@
+"""
+Browser network traffic as seen by Chrome's performance log.
+
+Drivers started with `enable_performance_log(options)` record CDP Network and
+Page events. `network_log(driver)` returns the driver's NetworkLog, which drains
+those events into a shared buffer so several consumers can read the same
+traffic, each keeping its own cursor into `requests` and `navigations`.
+"""
+import json
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from config import API_BASE_URL
+
+
+def enable_performance_log(options):
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class NetworkLog:
+    def __init__(self, driver):
+        self.driver = driver
+        self.requests = []
+        self.navigations = []
+        self._by_id = {}
+
+    def poll(self):
+        """Move any new performance-log events into `requests` and `navigations`."""
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            return
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message["method"], message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                request = {
+                    "id": params["requestId"],
+                    "method": params["request"]["method"],
+                    "url": params["request"]["url"],
+                    "type": params.get("type", ""),
+                    "status": None,
+                }
+                self._by_id[request["id"]] = request
+                self.requests.append(request)
+            elif method == "Network.responseReceived":
+                request = self._by_id.get(params["requestId"])
+                if request:
+                    request["status"] = params["response"]["status"]
+            elif method == "Page.frameNavigated" and not params["frame"].get("parentId"):
+                self.navigations.append(params["frame"]["url"])
+            elif method == "Page.navigatedWithinDocument":
+                self.navigations.append(params["url"])
+
+    def current_route(self):
+        return urlsplit(self.navigations[-1]).path if self.navigations else None
+
+
+def network_log(driver):
+    log = getattr(driver, "_network_log", None)
+    if log is None:
+        log = driver._network_log = NetworkLog(driver)
+    return log
+
+
+def is_api_request(request):
+    return request["url"].startswith(API_BASE_URL) and request["method"] != "OPTIONS"
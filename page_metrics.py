@@ -0,0 +1,287 @@
+"""
+Frontend page-load metrics for every `driver.get`.
+
+With `--page-metrics`, each navigation gets PerformanceObservers for LCP and long
+tasks installed right after it loads; when that window navigates again, when the
+test ends or when the browser quits, the page's Navigation Timing, paint and LCP
+timings, long tasks and JS heap size are read back and filed under the requested
+route. Routes are tracked per window, so tests that share a browser through
+contexts (--shared-browser) or a read-only page never file one window's page
+under another's route.
+
+At session end the per-route medians are compared with page_baselines.json and
+regressions are reported. No baseline file is shipped, since the numbers depend
+on the machine and the build: create it on the machine that runs the comparison
+with `pytest --page-metrics --update-page-baselines`, which rewrites it from the
+current run, and commit it from there. Without the file nothing is compared.
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from driver_hooks import add_command_hook
+from stats import summarize
+
+DEFAULT_BASELINE_FILE = Path(__file__).parent / "page_baselines.json"
+
+METRICS = (
+    "ttfb_ms", "dom_content_loaded_ms", "load_ms", "first_paint_ms",
+    "first_contentful_paint_ms", "largest_contentful_paint_ms",
+    "long_tasks", "long_task_ms", "js_heap_bytes", "transfer_bytes",
+)
+
+_OBSERVE_SCRIPT = """
+if (!window.__pageMetrics) {
+    const m = window.__pageMetrics = {lcp: null, longTasks: 0, longTaskMs: 0};
+    try {
+        new PerformanceObserver(list => {
+            for (const e of list.getEntries()) m.lcp = e.startTime;
+        }).observe({type: 'largest-contentful-paint', buffered: true});
+    } catch (e) {}
+    try {
+        new PerformanceObserver(list => {
+            for (const e of list.getEntries()) { m.longTasks++; m.longTaskMs += e.duration; }
+        }).observe({type: 'longtask', buffered: true});
+    } catch (e) {}
+}
+"""
+
+_COLLECT_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const paint = {};
+for (const e of performance.getEntriesByType('paint')) paint[e.name] = e.startTime;
+const m = window.__pageMetrics || {};
+return {
+    ttfb_ms: nav ? nav.responseStart : null,
+    dom_content_loaded_ms: nav ? nav.domContentLoadedEventEnd : null,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd : null,
+    transfer_bytes: nav ? nav.transferSize : null,
+    first_paint_ms: paint['first-paint'] ?? null,
+    first_contentful_paint_ms: paint['first-contentful-paint'] ?? null,
+    largest_contentful_paint_ms: m.lcp ?? null,
+    long_tasks: window.__pageMetrics ? m.longTasks : null,
+    long_task_ms: window.__pageMetrics ? m.longTaskMs : null,
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null
+};
+"""
+
+page_samples = defaultdict(list)
+regressions = []
+missing_baselines = []
+_trackers = []
+
+
+def _js_heap_from_cdp(driver):
+    try:
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    except (AttributeError, WebDriverException):
+        return None
+    return next((m["value"] for m in metrics if m["name"] == "JSHeapUsedSize"), None)
+
+
+def _collect(driver, route):
+    try:
+        sample = driver.execute_script(_COLLECT_SCRIPT)
+    except WebDriverException:
+        return
+    heap = _js_heap_from_cdp(driver)
+    if heap is not None:
+        sample["js_heap_bytes"] = heap
+    page_samples[route].append(sample)
+
+
+def _enable_performance(driver):
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+    except (AttributeError, WebDriverException):
+        pass
+
+
+def pytest_driver_context_created(driver, context, request):
+    # CDP domains are enabled per target; each new context's window needs its own.
+    if request.config.getoption("page_metrics"):
+        _enable_performance(driver)
+
+
+class RouteTracker:
+    """The route loaded in each window of one driver whose metrics are still to be read."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.routes = {}
+
+    def collect(self, handle):
+        route = self.routes.pop(handle, None)
+        if route:
+            _collect(self.driver, route)
+
+    def collect_all(self):
+        """Read every window's pending page, then return to the window that was active."""
+        if not self.routes:
+            return
+        try:
+            active = self.driver.current_window_handle
+        except WebDriverException:
+            active = None
+        for handle in list(self.routes):
+            try:
+                self.driver.switch_to.window(handle)
+            except WebDriverException:  # the window is gone along with its page
+                self.routes.pop(handle)
+                continue
+            self.collect(handle)
+        if active in self.driver.window_handles:
+            self.driver.switch_to.window(active)
+
+
+def pytest_driver_created(driver, request):
+    if not request.config.getoption("page_metrics"):
+        return
+    _enable_performance(driver)
+    tracker = RouteTracker(driver)
+    _trackers.append(tracker)
+
+    def hook(driver, command, params, execute):
+        if command == Command.QUIT:
+            tracker.collect_all()
+            _trackers.remove(tracker)
+            return execute(command, params)
+        if command != Command.GET:
+            return execute(command, params)
+        handle = driver.current_window_handle
+        tracker.collect(handle)
+        response = execute(command, params)
+        if urlsplit(params["url"]).scheme in ("http", "https"):
+            tracker.routes[handle] = urlsplit(params["url"]).path or "/"
+            try:
+                driver.execute_script(_OBSERVE_SCRIPT)
+            except WebDriverException:
+                pass
+        return response
+
+    add_command_hook(driver, hook)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_teardown(item):
+    # Before the fixtures close the test's contexts, and so that a page a test leaves
+    # open on a shared browser is filed with that test.
+    for tracker in _trackers:
+        try:
+            tracker.collect_all()
+        except WebDriverException:
+            pass
+
+
+def summarize_routes(samples_by_route):
+    summary = {}
+    for route, samples in sorted(samples_by_route.items()):
+        summary[route] = {
+            metric: summarize(s[metric] for s in samples if s.get(metric) is not None)
+            for metric in METRICS
+        }
+    return summary
+
+
+def compare_to_baselines(summary, baselines, tolerance):
+    """Metrics whose median grew more than `tolerance` (a fraction) over the baseline median."""
+    found = []
+    for route, metrics in summary.items():
+        for metric, baseline in baselines.get(route, {}).items():
+            current = metrics.get(metric, {}).get("p50")
+            if current is None or baseline is None:
+                continue
+            if current > baseline * (1 + tolerance):
+                found.append({"route": route, "metric": metric, "p50": current, "baseline": baseline})
+    return found
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("page metrics")
+    group.addoption(
+        "--page-metrics", action="store_true", default=False,
+        help="collect page-load metrics for every driver.get and compare them with the baselines",
+    )
+    group.addoption(
+        "--page-metrics-json", metavar="PATH", default=None,
+        help="write the raw per-route samples and their summary as JSON to PATH",
+    )
+    group.addoption(
+        "--page-baseline-file", metavar="PATH", default=str(DEFAULT_BASELINE_FILE),
+        help="baseline medians per route and metric (default: page_baselines.json)",
+    )
+    group.addoption(
+        "--page-baseline-tolerance", type=float, default=0.2,
+        help="allowed relative growth of a median over its baseline before it is reported (default: 0.2)",
+    )
+    group.addoption(
+        "--update-page-baselines", action="store_true", default=False,
+        help="rewrite the baseline file with this run's medians",
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for route, samples in getattr(node, "workeroutput", {}).get("page_samples", {}).items():
+        page_samples[route].extend(samples)
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("page_metrics"):
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["page_samples"] = dict(page_samples)
+        return
+    summary = summarize_routes(page_samples)
+    baseline_file = Path(config.getoption("page_baseline_file"))
+    if config.getoption("update_page_baselines"):
+        baselines = {
+            route: {metric: s["p50"] for metric, s in metrics.items() if s["count"]}
+            for route, metrics in summary.items()
+        }
+        with baseline_file.open("w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+    elif baseline_file.exists():
+        with baseline_file.open(encoding="utf-8") as f:
+            baselines = json.load(f)
+        regressions[:] = compare_to_baselines(summary, baselines, config.getoption("page_baseline_tolerance"))
+    else:
+        missing_baselines.append(str(baseline_file))
+    path = config.getoption("page_metrics_json")
+    if path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "samples": page_samples}, f, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("page_metrics") or hasattr(config, "workeroutput") or not page_samples:
+        return
+    terminalreporter.write_sep("-", "page load per route (median ms)")
+    terminalreporter.write_line(
+        f"{'route':<24} {'loads':>5} {'ttfb':>7} {'dcl':>7} {'load':>7} {'fcp':>7} {'lcp':>7} "
+        f"{'long tasks':>10} {'heap MB':>8}"
+    )
+    for route, m in summarize_routes(page_samples).items():
+        def p50(metric, scale=1):
+            value = m[metric].get("p50")
+            return f"{value / scale:.1f}" if value is not None else "-"
+        terminalreporter.write_line(
+            f"{route:<24} {len(page_samples[route]):>5} {p50('ttfb_ms'):>7} {p50('dom_content_loaded_ms'):>7} "
+            f"{p50('load_ms'):>7} {p50('first_contentful_paint_ms'):>7} {p50('largest_contentful_paint_ms'):>7} "
+            f"{p50('long_tasks'):>10} {p50('js_heap_bytes', 1024 * 1024):>8}"
+        )
+    for path in missing_baselines:
+        terminalreporter.write_line(f"no page baselines at {path}; create them with --update-page-baselines")
+    for r in regressions:
+        terminalreporter.write_line(
+            f"REGRESSION {r['route']} {r['metric']}: median {r['p50']:.1f} vs baseline {r['baseline']:.1f}",
+            yellow=True,
+        )
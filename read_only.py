@@ -0,0 +1,174 @@
+"""
+Shared logged-in page for read-only UI tests.
+
+Tests marked `@pytest.mark.read_only(route="/settings")` get, as their `driver`,
+one Chrome per test module that has already logged in as the superuser and
+loaded `route`, instead of starting a browser, logging in and navigating for
+every test. Between tests the page is reset: Escape closes open menus and
+dialogs, the window scrolls to the top, and if the previous test left `route`
+or interacted with the page (a click, key presses, pointer actions) the route is
+loaded again, so state such as the tab chosen on /settings doesn't carry over
+into the next test.
+
+A test that turns out not to be read-only falls back to isolation: if it typed
+into or cleared a field, sent a non-GET request to the API, or failed, the shared
+browser is thrown away and the next test in the module starts from a fresh login.
+Those tests are listed at the end of the run so the marker can be taken off them.
+Each module's read-only tests share one xdist_group, so under xdist
+`--dist loadgroup` keeps them on one worker (see scheduler.py).
+"""
+from urllib.parse import urlsplit
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+
+from config import BASE_URL
+from driver_hooks import add_command_hook
+from helpers import login_as_superuser
+from network_log import enable_performance_log, is_api_request, network_log
+
+MUTATING_COMMANDS = (Command.SEND_KEYS_TO_ELEMENT, Command.CLEAR_ELEMENT)
+INTERACTING_COMMANDS = (Command.CLICK_ELEMENT, Command.W3C_ACTIONS, *MUTATING_COMMANDS)
+
+mutating_tests = []
+
+
+class SharedPage:
+    """A logged-in browser reused by consecutive read-only tests."""
+
+    def __init__(self, start):
+        self.start = start
+        self.driver = None
+        self.reasons = []
+        self._cursor = 0
+        self.logins = 0
+        self.interacted = False
+
+    def _watch(self, driver, command, params, execute):
+        if command in MUTATING_COMMANDS:
+            self.reasons.append("typed into a field")
+        if command in INTERACTING_COMMANDS:
+            self.interacted = True
+        return execute(command, params)
+
+    def _api_writes(self):
+        log = network_log(self.driver)
+        log.poll()
+        writes = [
+            f"{r['method']} {urlsplit(r['url']).path}"
+            for r in log.requests[self._cursor:]
+            if is_api_request(r) and r["method"] not in ("GET", "HEAD")
+        ]
+        self._cursor = len(log.requests)
+        return writes
+
+    def _open(self, route):
+        self.driver = self.start()
+        login_as_superuser(self.driver)
+        self.logins += 1
+        if route != "/":
+            self.driver.get(f"{BASE_URL}{route}")
+        add_command_hook(self.driver, self._watch)
+        self.interacted = False
+        self._api_writes()
+
+    def reset(self, route):
+        reload = self.interacted  # before the Escape below counts as an interaction
+        ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
+        self.driver.execute_script("window.scrollTo(0, 0)")
+        if reload or urlsplit(self.driver.current_url).path != route:
+            self.driver.get(f"{BASE_URL}{route}")
+        self.interacted = False
+        self._api_writes()
+
+    def checkout(self, route="/"):
+        """The shared driver, logged in and showing `route`."""
+        if self.driver is None:
+            self._open(route)
+        else:
+            try:
+                self.reset(route)
+            except WebDriverException:
+                self.close()
+                self._open(route)
+        self.reasons = []
+        return self.driver
+
+    def checkin(self, failed=False):
+        """Hand the page back; returns why it can't be reused (and closes it), or None."""
+        self.reasons.extend(f"sent {write}" for write in self._api_writes())
+        if failed:
+            self.reasons.append("failed")
+        if not self.reasons:
+            return None
+        self.close()
+        return self.reasons
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+            self._cursor = 0
+
+
+failed_key = pytest.StashKey[bool]()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed:
+        item.stash[failed_key] = True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    # Before xdist reads the groups into the nodeids.
+    for item in items:
+        if item.get_closest_marker("read_only"):
+            item.add_marker(pytest.mark.xdist_group(f"read_only:{item.nodeid.split('::')[0]}"))
+
+
+def pytest_driver_options(options, request):
+    if request.fixturename == "read_only_page":
+        enable_performance_log(options)
+
+
+@pytest.fixture(scope="module")
+def read_only_page(request, browser_factory):
+    """The module's shared page; used by `driver` for tests marked read_only."""
+    page = SharedPage(lambda: browser_factory(request))
+    yield page
+    page.close()
+
+
+@pytest.fixture
+def read_only_driver(request, read_only_page):
+    """What `driver` returns for a test marked read_only."""
+    route = request.node.get_closest_marker("read_only").kwargs.get("route", "/")
+    yield read_only_page.checkout(route)
+    reasons = read_only_page.checkin(failed=request.node.stash.get(failed_key, False))
+    if reasons and reasons != ["failed"]:
+        mutating_tests.append((request.node.nodeid, ", ".join(reasons)))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    mutating_tests.extend(tuple(t) for t in getattr(node, "workeroutput", {}).get("read_only_mutations", []))
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["read_only_mutations"] = mutating_tests
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workeroutput") or not mutating_tests:
+        return
+    terminalreporter.write_sep("-", "read_only tests that changed state (ran isolated from the next test)")
+    for nodeid, reasons in mutating_tests:
+        terminalreporter.write_line(f"{nodeid}: {reasons}", yellow=True)
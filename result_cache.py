@@ -0,0 +1,188 @@
+"""
+Skip tests that already passed against the same build.
+
+At collection the build is fingerprinted: the backend by its OpenAPI schema
+(which carries its version), the frontend by a build id. That is FRONTEND_BUILD_ID
+if set, else the Vite manifest (/.vite/manifest.json) if the server exposes it,
+else the content-hashed asset names of a production index.html. The Vite dev
+server has no build id (it serves sources compiled on demand), so UI tests are
+never cached against it. A test's key is the hash of the parts it depends on (the
+backend for every test, the frontend too for UI tests), the contents of its own
+file and every harness file next to this one: the modules (*.py), pytest.ini and
+the JSON configs such as the latency and network budgets, which decide outcomes
+too. Tests whose last recorded pass has the same key are skipped with a note;
+everything that passes is recorded in .perf/result_cache.json for the next run,
+and a failure drops the entry.
+
+Benchmarks are never cached. Nothing is skipped when a fingerprint cannot be
+taken (a service is down), with the stand-in backend or cassettes, or with
+`--force-full-run`.
+"""
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from api_helpers import API_V1_STR, api
+from config import BASE_URL, FRONTEND_BUILD_ID
+
+DEFAULT_CACHE_FILE = Path(__file__).parent / ".perf" / "result_cache.json"
+
+HARNESS_PATTERNS = ("*.py", "*.json", "pytest.ini")
+
+ASSET = re.compile(r'<(?:script|link)[^>]+(?:src|href)="([^"]+)"')
+# Vite names built assets like /assets/index-B2x7kQ9d.js; the dev server does not.
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8,}\.(?:js|css)$")
+
+fingerprints = {}
+passed = {}
+failed = set()
+_file_hashes = {}
+
+
+def _sha(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def backend_fingerprint():
+    try:
+        response = requests.get(f"{api.base_url}{API_V1_STR}/openapi.json", timeout=5)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    return _sha(response.content)
+
+
+def frontend_fingerprint():
+    """The frontend's build id, or None when it has none (dev server) or is down."""
+    if FRONTEND_BUILD_ID:
+        return _sha(FRONTEND_BUILD_ID)
+    try:
+        with requests.Session() as session:
+            manifest = session.get(f"{BASE_URL}/.vite/manifest.json", timeout=5)
+            if manifest.ok and manifest.headers.get("content-type", "").startswith("application/json"):
+                return _sha(manifest.content)
+            page = session.get(BASE_URL, timeout=5)
+            page.raise_for_status()
+    except requests.RequestException:
+        return None
+    if "/@vite/client" in page.text:
+        return None
+    assets = sorted(set(src for src in ASSET.findall(page.text) if HASHED_ASSET.search(src)))
+    return _sha(*assets) if assets else None
+
+
+def harness_hashes(root):
+    """Hashes of every harness file under `root`, in a stable order."""
+    paths = sorted({path for pattern in HARNESS_PATTERNS for path in Path(root).glob(pattern)})
+    return [_sha(path.name, file_hash(path)) for path in paths]
+
+
+def file_hash(path):
+    path = Path(path)
+    if path not in _file_hashes:
+        _file_hashes[path] = _sha(path.read_bytes()) if path.exists() else ""
+    return _file_hashes[path]
+
+
+def cache_key(item, build):
+    """The cache key for `item`, or None if the build parts it depends on are unknown."""
+    parts = [build["backend"]]
+    if "driver" in item.fixturenames:
+        parts.append(build["frontend"])
+    if None in parts:
+        return None
+    return _sha(*parts, file_hash(item.path), *build["harness"])
+
+
+def load_cache(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("result cache")
+    group.addoption(
+        "--force-full-run", action="store_true", default=False,
+        help="run every test even if it already passed against this build",
+    )
+    group.addoption(
+        "--result-cache", metavar="PATH", default=str(DEFAULT_CACHE_FILE),
+        help="where passing results are cached (default: .perf/result_cache.json)",
+    )
+
+
+def _cache_enabled(config):
+    return (
+        config.getoption("api_backend") == "real"
+        and config.getoption("api_cassettes") == "off"
+        and not config.option.collectonly
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if not _cache_enabled(config) or not items:
+        return
+    build = {"backend": backend_fingerprint(), "frontend": None, "harness": harness_hashes(config.rootpath)}
+    if any("driver" in item.fixturenames for item in items):
+        build["frontend"] = frontend_fingerprint()
+    cache = {} if config.getoption("force_full_run") else load_cache(config.getoption("result_cache"))
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            continue  # a benchmark is run for its numbers, not its outcome
+        key = cache_key(item, build)
+        if key is None:
+            continue
+        fingerprints[item.nodeid] = key
+        entry = cache.get(item.nodeid)
+        if entry and entry["key"] == key:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["passed_at"]))
+            item.add_marker(pytest.mark.skip(reason=f"passed against this build at {when} (result cache)"))
+
+
+def pytest_runtest_logreport(report):
+    if report.failed:
+        failed.add(report.nodeid)
+        passed.pop(report.nodeid, None)
+    elif report.when == "call" and report.passed and report.nodeid in fingerprints:
+        passed[report.nodeid] = fingerprints[report.nodeid]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    output = getattr(node, "workeroutput", {}).get("result_cache", {})
+    passed.update(output.get("passed", {}))
+    failed.update(output.get("failed", []))
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not _cache_enabled(config):
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["result_cache"] = {"passed": passed, "failed": sorted(failed)}
+        return
+    if not passed and not failed:
+        return
+    path = Path(config.getoption("result_cache"))
+    cache = load_cache(path)
+    now = time.time()
+    for nodeid in failed:
+        cache.pop(nodeid, None)
+    for nodeid, key in passed.items():
+        if nodeid not in failed:
+            cache[nodeid] = {"key": key, "passed_at": now}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
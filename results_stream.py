@@ -0,0 +1,215 @@
+"""
+Stream test results to a JSONL file as they happen.
+
+With `--results-stream=PATH`, every test phase (setup, call, teardown) appends
+one JSON line with the outcome, duration, worker id, the test's markers (auth,
+items, admin, ...) and, for failures, the one-line crash message. Each line is a
+single write to a file opened with O_APPEND, so xdist workers can share the file
+without interleaving, and nothing is buffered: a line is on disk as soon as the
+phase is reported. The run also writes `session_start`/`session_end` lines, and
+every line carries the run id so several runs can share one file.
+
+Follow a run from another terminal with:
+
+    python results_stream.py PATH --follow
+
+which prints failures as they arrive and a running tally of outcomes per marker;
+without --follow it summarizes the file and exits.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import pytest
+
+from config import WORKER_ID
+
+RUN_ENV = "PYTEST_RESULTS_STREAM_RUN"
+UNREPORTED_MARKERS = {"parametrize", "skip", "skipif", "xfail", "usefixtures", "filterwarnings"}
+
+_stream = {"fd": None, "run": None}
+_markers = {}
+
+
+def _emit(event, **fields):
+    line = json.dumps({"event": event, "run": _stream["run"], "worker": WORKER_ID, "at": time.time(), **fields})
+    os.write(_stream["fd"], (line + "\n").encode())
+
+
+def _failure(report):
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message.splitlines()[0] if crash.message else ""
+    if isinstance(report.longrepr, tuple):  # skips: (path, lineno, reason)
+        return report.longrepr[2]
+    return str(report.longrepr).splitlines()[-1] if report.longrepr else ""
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("results stream")
+    group.addoption(
+        "--results-stream", metavar="PATH", default=None,
+        help="append one JSON line per test phase to PATH as results come in",
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption("results_stream")
+    if not path:
+        return
+    # The controller picks the run id; xdist workers inherit it through the environment.
+    if not hasattr(config, "workerinput"):
+        os.environ[RUN_ENV] = uuid.uuid4().hex[:12]
+    _stream["run"] = os.environ.get(RUN_ENV)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _stream["fd"] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+
+def pytest_unconfigure(config):
+    if _stream["fd"] is not None:
+        os.close(_stream["fd"])
+        _stream["fd"] = None
+
+
+def pytest_sessionstart(session):
+    if _stream["fd"] is not None and not hasattr(session.config, "workerinput"):
+        _emit("session_start", args=session.config.invocation_params.args)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    if _stream["fd"] is None:
+        return
+    for item in items:
+        _markers[item.nodeid] = sorted({m.name for m in item.iter_markers()} - UNREPORTED_MARKERS)
+    _emit("collected", tests=len(items))
+
+
+def pytest_runtest_logreport(report):
+    if _stream["fd"] is None or hasattr(report, "node"):
+        return  # on the xdist controller the worker has already written the line
+    fields = {
+        "nodeid": report.nodeid,
+        "when": report.when,
+        "outcome": report.outcome,
+        "duration_s": round(report.duration, 4),
+        "markers": _markers.get(report.nodeid, []),
+    }
+    if report.failed or report.skipped:
+        fields["message"] = _failure(report)
+    _emit("phase", **fields)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if _stream["fd"] is not None and not hasattr(session.config, "workerinput"):
+        _emit("session_end", exitstatus=int(exitstatus))
+
+
+class Tally:
+    """Running totals over the lines of one run."""
+
+    def __init__(self):
+        self.run = None
+        self.collected = None
+        self.outcomes = Counter()
+        self.by_marker = defaultdict(Counter)
+        self.durations = {}
+        self.finished = False
+
+    def add(self, event, out):
+        if event["run"] != self.run:
+            self.__init__()
+            self.run = event["run"]
+        kind = event["event"]
+        if kind == "collected":
+            self.collected = max(self.collected or 0, event["tests"])
+        elif kind == "session_end":
+            self.finished = True
+        elif kind == "phase":
+            outcome = self.outcome_of(event)
+            if outcome is None:
+                return
+            self.outcomes[outcome] += 1
+            for marker in event["markers"] or ["(none)"]:
+                self.by_marker[marker][outcome] += 1
+            if event["when"] == "call":
+                self.durations[event["nodeid"]] = event["duration_s"]
+            if outcome in ("failed", "error"):
+                where = "" if event["when"] == "call" else f" [{event['when']}]"
+                print(
+                    f"{outcome.upper()} {event['nodeid']}{where} ({event['worker']}): {event.get('message', '')}",
+                    file=out,
+                )
+
+    @staticmethod
+    def outcome_of(event):
+        """One outcome per test: its call result, or a setup/teardown error or skip."""
+        if event["outcome"] == "failed":
+            return "failed" if event["when"] == "call" else "error"
+        if event["when"] == "call" or (event["when"] == "setup" and event["outcome"] == "skipped"):
+            return event["outcome"]
+        return None
+
+    def status(self):
+        done = sum(self.outcomes.values())
+        total = f"/{self.collected}" if self.collected else ""
+        counts = ", ".join(f"{n} {outcome}" for outcome, n in sorted(self.outcomes.items()))
+        return f"{done}{total} done: {counts or 'nothing yet'}{' (finished)' if self.finished else ''}"
+
+    def summary(self, out, slowest=5):
+        print(self.status(), file=out)
+        for marker, counts in sorted(self.by_marker.items()):
+            print(f"  {marker:<16} " + ", ".join(f"{n} {o}" for o, n in sorted(counts.items())), file=out)
+        for nodeid, seconds in sorted(self.durations.items(), key=lambda kv: -kv[1])[:slowest]:
+            print(f"  {seconds:8.2f}s {nodeid}", file=out)
+
+
+def tail(path, follow=False, interval=1.0, out=sys.stdout):
+    """
+    Aggregate the latest run in `path`; with `follow`, keep reading until it ends
+    (a run that had already ended when the tail started does not count).
+    """
+    tally = Tally()
+    while follow and not os.path.exists(path):
+        time.sleep(interval)
+    started_at = os.path.getsize(path)
+    with open(path, encoding="utf-8") as f:
+        pending = ""
+        last_status = None
+        while True:
+            chunk = f.read()
+            pending += chunk
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                if line.strip():
+                    tally.add(json.loads(line), out)
+            if not follow or (tally.finished and f.tell() > started_at):
+                break
+            status = tally.status()
+            if status != last_status:
+                print(status, file=out, flush=True)
+                last_status = status
+            if not chunk:
+                time.sleep(interval)
+    tally.summary(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize or follow a --results-stream file.")
+    parser.add_argument("path")
+    parser.add_argument("--follow", "-f", action="store_true", help="keep reading until the run ends")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between polls while following")
+    args = parser.parse_args(argv)
+    try:
+        tail(args.path, args.follow, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Duration-aware test order.
+
+Every run's per-test durations (setup + call + teardown) are kept in the timing
+store. The controlling process reads it once at start-up and hands that history
+to the xdist workers, so they all collect the same order. At collection, tests
+are ordered longest-first by their mean over recent runs; tests without history
+are given the median of the known ones. Run with
+`-n <workers> --dist loadgroup`: xdist hands the tests out in this order as
+workers free up, so the long tests start first and no worker idles while others
+still have a backlog; that is the longest-processing-time-first schedule.
+Tests marked read_only stay together per module, and loadgroup keeps each such
+module on one worker, so they keep sharing a page. `--dist worksteal` balances
+a little better but moves read-only tests between workers, each of which then
+logs in a page of its own.
+
+At the end of the run the schedule predicted from history (greedy LPT over the
+observed number of workers) is printed next to each worker's actual completion
+time, measured from its first test. `--test-order=file` keeps collection order.
+"""
+import heapq
+import time
+from collections import defaultdict
+
+import pytest
+
+from config import WORKER_ID
+from stats import percentile
+from timing_store import DEFAULT_PATH, TimingStore
+
+DEFAULT_ESTIMATE_S = 1.0
+
+estimates = {}
+durations = defaultdict(float)
+outcomes = {}
+workers = {}
+started_at = {}
+finished_at = {}
+_session_start = [0.0]
+
+
+def estimate_for(nodeids, known):
+    """Estimated seconds per nodeid; unknown tests get the median of the known ones."""
+    fallback = percentile(known.values(), 50) or DEFAULT_ESTIMATE_S
+    return {nodeid: known.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def schedule_units(items):
+    """Lists of items that must run back to back; read_only tests stay grouped per module."""
+    units, by_module = [], {}
+    for item in items:
+        if item.get_closest_marker("read_only"):
+            module = item.nodeid.split("::")[0]
+            if module not in by_module:
+                by_module[module] = []
+                units.append(by_module[module])
+            by_module[module].append(item)
+        else:
+            units.append([item])
+    return units
+
+
+def predict_shards(seconds, workers):
+    """Greedy longest-first assignment; the completion time of each shard, longest first."""
+    shards = [0.0] * max(workers, 1)
+    heapq.heapify(shards)
+    for duration in sorted(seconds, reverse=True):
+        heapq.heapreplace(shards, shards[0] + duration)
+    return sorted(shards, reverse=True)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("scheduling")
+    group.addoption(
+        "--test-order", choices=("longest-first", "file"), default="longest-first",
+        help="order tests by their recorded duration, longest first, or keep file order (default: longest-first)",
+    )
+    group.addoption(
+        "--timing-db", metavar="PATH", default=str(DEFAULT_PATH),
+        help="SQLite store of past timings (default: .perf/timings.sqlite)",
+    )
+
+
+def pytest_configure(config):
+    # Read once, by the controller: workers that each read the store could see a run
+    # finish in between, order their tests differently and make xdist abort with
+    # "Different tests were collected".
+    if hasattr(config, "workerinput"):
+        estimates.update(config.workerinput.get("test_estimates", {}))
+    else:
+        estimates.update(TimingStore(config.getoption("timing_db")).test_estimates())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["test_estimates"] = estimates
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("test_order") != "longest-first" or not estimates:
+        return
+    seconds = estimate_for([item.nodeid for item in items], estimates)
+    units = schedule_units(items)
+    units.sort(key=lambda unit: sum(seconds[item.nodeid] for item in unit), reverse=True)
+    items[:] = [item for unit in units for item in unit]
+
+
+def pytest_sessionstart(session):
+    _session_start[0] = time.perf_counter()
+
+
+def pytest_runtest_logreport(report):
+    now = time.perf_counter() - _session_start[0]
+    gateway = getattr(getattr(report, "node", None), "gateway", None)
+    worker = gateway.id if gateway else WORKER_ID
+    durations[report.nodeid] += report.duration
+    if report.when == "setup":
+        started_at.setdefault(worker, now - report.duration)
+    if report.when == "call" or report.outcome != "passed":
+        outcomes.setdefault(report.nodeid, report.outcome)
+    if report.when == "teardown":
+        workers[report.nodeid] = worker
+        finished_at[worker] = now
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workeroutput") or config.option.collectonly or not workers:
+        return
+    TimingStore(config.getoption("timing_db")).save_run(
+        workers=len(finished_at),
+        wall_s=time.perf_counter() - _session_start[0],
+        durations=[
+            (nodeid, worker, outcomes.get(nodeid, "passed"), durations[nodeid])
+            for nodeid, worker in workers.items()
+        ],
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workeroutput") or not estimates or not finished_at:
+        return
+    seconds = estimate_for(workers, estimates)
+    predicted = predict_shards(seconds.values(), len(finished_at))
+    actual = sorted((finished_at[w] - started_at.get(w, 0.0) for w in finished_at), reverse=True)
+    with_history = sum(1 for nodeid in workers if nodeid in estimates)
+    terminalreporter.write_sep("-", "shard completion: predicted from history vs actual (s)")
+    terminalreporter.write_line(f"workers: {len(finished_at)}, tests with history: {with_history}/{len(workers)}")
+    terminalreporter.write_line(f"{'shard':<6} {'predicted':>10} {'actual':>10}")
+    for i, (p, a) in enumerate(zip(predicted, actual), 1):
+        terminalreporter.write_line(f"{i:<6} {p:>10.1f} {a:>10.1f}")
+    terminalreporter.write_line(f"makespan: predicted {predicted[0]:.1f}s, actual {actual[0]:.1f}s")
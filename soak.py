@@ -0,0 +1,137 @@
+"""
+Soak runs: resource growth over hours of UI use in one browser.
+
+The soak benchmark (tests/benchmarks/test_soak.py) loops the UI flows for
+`--soak-duration` seconds and, every `--soak-sample-every` seconds, forces a
+garbage collection in the page and samples the browser's JS heap, DOM node,
+document and event listener counts through CDP, plus the resident memory of a
+local backend process given with `--soak-backend-pid` (read from /proc, so Linux
+only). Every sample, every failed flow and every failed recovery is appended to
+`--soak-out` as one JSON line and flushed, so a run can be tailed while it goes
+and survives being killed. A sample taken while CDP could not be read carries a
+`cdp_error` instead of the page counters.
+
+At the end each metric gets a growth rate per hour, fitted after the first
+tenth of the samples (caches and JIT warming up); a metric that keeps growing
+steadily (r2 >= 0.6) by more than 10% of its starting value over the run is
+reported as a leak.
+"""
+import json
+import time
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from bench import fit_growth
+
+DEFAULT_SOAK_FILE = Path(__file__).parent / ".perf" / "benchmarks" / "soak.jsonl"
+
+CDP_METRICS = {
+    "JSHeapUsedSize": "js_heap_bytes",
+    "Nodes": "dom_nodes",
+    "Documents": "documents",
+    "JSEventListeners": "listeners",
+}
+METRICS = (*CDP_METRICS.values(), "backend_rss_bytes")
+
+WARMUP_FRACTION = 0.1
+LEAK_R2 = 0.6
+LEAK_GROWTH = 0.1
+
+
+def backend_rss(pid):
+    """Resident set size of `pid` in bytes, or None if it can't be read."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+class SoakLog:
+    """Append-only JSONL stream of a soak run's samples and events."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8")
+
+    def write(self, kind, **fields):
+        record = {"kind": kind, "at": time.time(), **fields}
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        return record
+
+    def close(self):
+        self.file.close()
+
+
+def first_line(error):
+    return (str(error).splitlines() or [type(error).__name__])[0]
+
+
+def sample(driver, backend_pid=None):
+    """
+    Current resource counters of the page (after a forced GC) and the backend. If
+    CDP can't be read the page counters are None and `cdp_error` says why.
+    """
+    values = dict.fromkeys(METRICS)
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+        for metric in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]:
+            if metric["name"] in CDP_METRICS:
+                values[CDP_METRICS[metric["name"]]] = metric["value"]
+    except (AttributeError, WebDriverException) as e:
+        values["cdp_error"] = first_line(e)
+    if backend_pid:
+        values["backend_rss_bytes"] = backend_rss(backend_pid)
+    return values
+
+
+def growth(samples):
+    """
+    Per metric: start and end values, growth per hour and whether it looks like a
+    leak, from samples carrying `elapsed_s` and the METRICS.
+    """
+    steady = samples[max(1, int(len(samples) * WARMUP_FRACTION)):] if len(samples) > 2 else samples
+    report = {}
+    for metric in METRICS:
+        points = [(s["elapsed_s"] / 3600, s[metric]) for s in steady if s.get(metric) is not None]
+        if len(points) < 2:
+            continue
+        hours, values = zip(*points)
+        fit = fit_growth(hours, values)
+        start = fit["intercept"] + fit["slope"] * hours[0]
+        grown = fit["slope"] * (hours[-1] - hours[0])
+        report[metric] = {
+            "start": values[0],
+            "end": values[-1],
+            "per_hour": fit["slope"],
+            "r2": fit["r2"],
+            "leak": fit["slope"] > 0 and fit["r2"] >= LEAK_R2 and grown > LEAK_GROWTH * max(start, 1),
+        }
+    return report
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--soak-duration", type=float, default=3600.0,
+        help="seconds the soak benchmark loops the UI flows (default: 3600)",
+    )
+    group.addoption(
+        "--soak-sample-every", type=float, default=30.0,
+        help="seconds between resource samples during a soak run (default: 30)",
+    )
+    group.addoption(
+        "--soak-backend-pid", type=int, default=None,
+        help="pid of a local backend process whose RSS is sampled during a soak run",
+    )
+    group.addoption(
+        "--soak-out", metavar="PATH", default=str(DEFAULT_SOAK_FILE),
+        help="JSONL file soak samples are appended to (default: .perf/benchmarks/soak.jsonl)",
+    )
@@ -0,0 +1,382 @@
+"""
+In-process stand-in for the backend API.
+
+Implements the /api/v1 endpoints the API suite uses (login, users, signup, me,
+items, health-check, password-recovery) over an in-memory store, with the status
+codes and messages of the real FastAPI backend. Select it with
+`--api-backend=stub` (or API_BACKEND=stub): the `api_backend` session fixture
+then starts it on a random local port and points the shared `api` session at it.
+The default, `real`, leaves `api` pointed at API_BASE_URL.
+"""
+import json
+import re
+import secrets
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from api_helpers import API_V1_STR, api
+from config import API_BACKEND, SUPERUSER_EMAIL, SUPERUSER_PASSWORD
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[A-Za-z]{2,}$")
+
+NOT_ENOUGH_PRIVILEGES = "The user doesn't have enough privileges"
+EMAIL_EXISTS = "The user with this email already exists in the system."
+
+
+class HTTPError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _validation_error(loc, msg, kind):
+    return HTTPError(422, [{"loc": ["body", loc], "msg": msg, "type": kind}])
+
+
+class Store:
+    """Users, items and tokens, guarded by a single lock."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = {}
+        self.items = {}
+        self.tokens = {}
+        self.create_user(SUPERUSER_EMAIL, SUPERUSER_PASSWORD, None, is_superuser=True)
+
+    def create_user(self, email, password, full_name, is_superuser=False, is_active=True):
+        if any(u["email"] == email for u in self.users.values()):
+            raise HTTPError(400, EMAIL_EXISTS)
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "full_name": full_name,
+            "is_active": is_active,
+            "is_superuser": is_superuser,
+            "password": password,
+        }
+        self.users[user["id"]] = user
+        return user
+
+    def user_by_email(self, email):
+        return next((u for u in self.users.values() if u["email"] == email), None)
+
+    def delete_user(self, user_id):
+        del self.users[user_id]
+        self.items = {k: v for k, v in self.items.items() if v["owner_id"] != user_id}
+        self.tokens = {k: v for k, v in self.tokens.items() if v != user_id}
+
+
+def public_user(user):
+    return {k: v for k, v in user.items() if k != "password"}
+
+
+def _page(rows, query):
+    skip = int(query.get("skip", 0))
+    limit = int(query.get("limit", 100))
+    return {"data": rows[skip:skip + limit], "count": len(rows)}
+
+
+def _user_fields(body, required):
+    fields = {}
+    for name in ("email", "password", "full_name", "is_active", "is_superuser"):
+        if name in body:
+            fields[name] = body[name]
+        elif name in required:
+            raise _validation_error(name, "Field required", "missing")
+    if "email" in fields and not EMAIL_PATTERN.match(str(fields["email"])):
+        raise _validation_error("email", "value is not a valid email address", "value_error")
+    if "password" in fields and not 8 <= len(str(fields["password"])) <= 40:
+        raise _validation_error("password", "String should have at least 8 characters", "string_too_short")
+    return fields
+
+
+def _item_fields(body, required):
+    fields = {}
+    if "title" in body:
+        if not 1 <= len(str(body["title"])) <= 255:
+            raise _validation_error("title", "String should have at least 1 character", "string_too_short")
+        fields["title"] = body["title"]
+    elif required:
+        raise _validation_error("title", "Field required", "missing")
+    if "description" in body:
+        fields["description"] = body["description"]
+    return fields
+
+
+class StubApi:
+    """Route table and handlers; each handler returns a JSON-serializable body."""
+
+    def __init__(self):
+        self.store = Store()
+        self.routes = [
+            ("POST", r"/login/access-token", self.login, False),
+            ("GET", r"/utils/health-check", self.health_check, False),
+            ("POST", r"/password-recovery/(?P<email>[^/]+)", self.password_recovery, False),
+            ("POST", r"/users/signup", self.signup, False),
+            ("GET", r"/users/me", self.read_me, True),
+            ("PATCH", r"/users/me", self.update_me, True),
+            ("PATCH", r"/users/me/password", self.update_password, True),
+            ("DELETE", r"/users/me", self.delete_me, True),
+            ("GET", r"/users", self.read_users, True),
+            ("POST", r"/users", self.create_user, True),
+            ("GET", r"/users/(?P<user_id>[^/]+)", self.read_user, True),
+            ("PATCH", r"/users/(?P<user_id>[^/]+)", self.update_user, True),
+            ("DELETE", r"/users/(?P<user_id>[^/]+)", self.delete_user, True),
+            ("GET", r"/items", self.read_items, True),
+            ("POST", r"/items", self.create_item, True),
+            ("GET", r"/items/(?P<item_id>[^/]+)", self.read_item, True),
+            ("PUT", r"/items/(?P<item_id>[^/]+)", self.update_item, True),
+            ("DELETE", r"/items/(?P<item_id>[^/]+)", self.delete_item, True),
+        ]
+
+    def handle(self, method, path, query, headers, body):
+        """Return (status, body) for one request."""
+        if not path.startswith(API_V1_STR):
+            return 404, {"detail": "Not Found"}
+        path = path[len(API_V1_STR):].rstrip("/")
+        allowed = False
+        for route_method, pattern, handler, authenticated in self.routes:
+            match = re.fullmatch(pattern, path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            try:
+                with self.store.lock:
+                    args = {k: unquote(v) for k, v in match.groupdict().items()}
+                    if authenticated:
+                        args["current_user"] = self._current_user(headers)
+                    return 200, handler(query=query, body=body, **args)
+            except HTTPError as e:
+                return e.status, {"detail": e.detail}
+        if allowed:
+            return 405, {"detail": "Method Not Allowed"}
+        return 404, {"detail": "Not Found"}
+
+    def _current_user(self, headers):
+        scheme, _, token = headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPError(401, "Not authenticated")
+        user_id = self.store.tokens.get(token)
+        if user_id is None:
+            raise HTTPError(403, "Could not validate credentials")
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise HTTPError(404, "User not found")
+        if not user["is_active"]:
+            raise HTTPError(400, "Inactive user")
+        return user
+
+    @staticmethod
+    def _require_superuser(user):
+        if not user["is_superuser"]:
+            raise HTTPError(403, NOT_ENOUGH_PRIVILEGES)
+
+    def _owned_item(self, item_id, current_user):
+        item = self.store.items.get(item_id)
+        if item is None:
+            raise HTTPError(404, "Item not found")
+        if not current_user["is_superuser"] and item["owner_id"] != current_user["id"]:
+            raise HTTPError(400, "Not enough permissions")
+        return item
+
+    def login(self, query, body):
+        user = self.store.user_by_email(body.get("username"))
+        if user is None or user["password"] != body.get("password"):
+            raise HTTPError(400, "Incorrect email or password")
+        if not user["is_active"]:
+            raise HTTPError(400, "Inactive user")
+        token = secrets.token_urlsafe(32)
+        self.store.tokens[token] = user["id"]
+        return {"access_token": token, "token_type": "bearer"}
+
+    def health_check(self, query, body):
+        return True
+
+    def password_recovery(self, query, body, email):
+        if self.store.user_by_email(email) is None:
+            raise HTTPError(404, "The user with this email does not exist in the system.")
+        return {"message": "Password recovery email sent"}
+
+    def signup(self, query, body):
+        fields = _user_fields(body, required=("email", "password"))
+        return public_user(self.store.create_user(fields["email"], fields["password"], fields.get("full_name")))
+
+    def read_me(self, query, body, current_user):
+        return public_user(current_user)
+
+    def update_me(self, query, body, current_user):
+        fields = _user_fields({k: v for k, v in body.items() if k in ("email", "full_name")}, required=())
+        existing = self.store.user_by_email(fields.get("email"))
+        if existing and existing["id"] != current_user["id"]:
+            raise HTTPError(409, "User with this email already exists")
+        current_user.update(fields)
+        return public_user(current_user)
+
+    def update_password(self, query, body, current_user):
+        if body.get("current_password") != current_user["password"]:
+            raise HTTPError(400, "Incorrect password")
+        if body.get("new_password") == current_user["password"]:
+            raise HTTPError(400, "New password cannot be the same as the current one")
+        current_user["password"] = _user_fields({"password": body.get("new_password")}, required=("password",))["password"]
+        return {"message": "Password updated successfully"}
+
+    def delete_me(self, query, body, current_user):
+        if current_user["is_superuser"]:
+            raise HTTPError(403, "Super users are not allowed to delete themselves")
+        self.store.delete_user(current_user["id"])
+        return {"message": "User deleted successfully"}
+
+    def read_users(self, query, body, current_user):
+        self._require_superuser(current_user)
+        return _page([public_user(u) for u in self.store.users.values()], query)
+
+    def create_user(self, query, body, current_user):
+        self._require_superuser(current_user)
+        fields = _user_fields(body, required=("email", "password"))
+        return public_user(self.store.create_user(
+            fields["email"], fields["password"], fields.get("full_name"),
+            is_superuser=fields.get("is_superuser", False), is_active=fields.get("is_active", True),
+        ))
+
+    def read_user(self, query, body, current_user, user_id):
+        if user_id == current_user["id"]:
+            return public_user(current_user)
+        self._require_superuser(current_user)
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise HTTPError(404, "User not found")
+        return public_user(user)
+
+    def update_user(self, query, body, current_user, user_id):
+        self._require_superuser(current_user)
+        user = self.store.users.get(user_id)
+        if user is None:
+            raise HTTPError(404, "The user with this id does not exist in the system")
+        fields = _user_fields(body, required=())
+        existing = self.store.user_by_email(fields.get("email"))
+        if existing and existing["id"] != user_id:
+            raise HTTPError(409, "User with this email already exists")
+        user.update(fields)
+        return public_user(user)
+
+    def delete_user(self, query, body, current_user, user_id):
+        self._require_superuser(current_user)
+        if user_id not in self.store.users:
+            raise HTTPError(404, "User not found")
+        if user_id == current_user["id"]:
+            raise HTTPError(403, "Super users are not allowed to delete themselves")
+        self.store.delete_user(user_id)
+        return {"message": "User deleted successfully"}
+
+    def read_items(self, query, body, current_user):
+        items = list(self.store.items.values())
+        if not current_user["is_superuser"]:
+            items = [i for i in items if i["owner_id"] == current_user["id"]]
+        return _page(items, query)
+
+    def create_item(self, query, body, current_user):
+        fields = _item_fields(body, required=True)
+        item = {"title": fields["title"], "description": fields.get("description"),
+                "id": str(uuid.uuid4()), "owner_id": current_user["id"]}
+        self.store.items[item["id"]] = item
+        return item
+
+    def read_item(self, query, body, current_user, item_id):
+        return self._owned_item(item_id, current_user)
+
+    def update_item(self, query, body, current_user, item_id):
+        item = self._owned_item(item_id, current_user)
+        item.update(_item_fields(body, required=False))
+        return item
+
+    def delete_item(self, query, body, current_user, item_id):
+        self._owned_item(item_id, current_user)
+        del self.store.items[item_id]
+        return {"message": "Item deleted successfully"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Buffer each response so headers and body leave in one segment (no Nagle stall).
+    wbufsize = -1
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            body = {k: v[-1] for k, v in parse_qs(raw.decode()).items()}
+        elif raw:
+            try:
+                body = json.loads(raw)
+            except ValueError:
+                body = None
+        else:
+            body = {}
+        if not isinstance(body, dict):
+            status, payload = 422, {"detail": [{"loc": ["body"], "msg": "Input should be a valid dictionary", "type": "dict_type"}]}
+        else:
+            status, payload = self.server.api.handle(self.command, url.path, query, self.headers, body)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubBackend:
+    """The stand-in API served from a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.api = StubApi()
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-backend", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--api-backend", choices=("real", "stub"), default=API_BACKEND,
+        help="run API tests against the real backend at API_BASE_URL or an in-process stand-in "
+             "(default: API_BACKEND env var, else real)",
+    )
+
+
+@pytest.fixture(scope="session")
+def api_backend(request):
+    """Base URL of the backend the API tests talk to."""
+    if request.config.getoption("api_backend") != "stub":
+        yield api.base_url
+        return
+    backend = StubBackend().start()
+    real_url, api.base_url = api.base_url, backend.url
+    yield backend.url
+    api.base_url = real_url
+    backend.stop()
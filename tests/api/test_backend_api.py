@@ -1,62 +1,15 @@
-import os
-import random
-import string
-import uuid
-from config import SUPERUSER_EMAIL, SUPERUSER_PASSWORD
 import pytest
 import requests
-from dotenv import load_dotenv
-
-# --- Configuration ---
-load_dotenv()
-BASE_URL = "http://localhost:8000"  # Change to your API base URL
-API_V1_STR = "/api/v1"
-
-
-# --- Helper Functions (Reused Code) ---
-
-def random_lower_string(length: int = 12) -> str:
-    """Generate a random string of lowercase letters."""
-    return "".join(random.choice(string.ascii_lowercase) for _ in range(length))
-
-
-def random_email() -> str:
-    """Generate a random email address."""
-    return f"{random_lower_string()}@test-api.com"
-
-
-def get_auth_headers(email: str, password: str) -> dict[str, str]:
-    """Authenticate a user and return authorization headers."""
-    login_data = {"username": email, "password": password}
-    try:
-        response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/login/access-token", data=login_data
-        )
-        response.raise_for_status()
-        tokens = response.json()
-        access_token = tokens["access_token"]
-        return {"Authorization": f"Bearer {access_token}"}
-    except requests.exceptions.ConnectionError as e:
-        pytest.fail(
-            f"API request failed during authentication for {email}. "
-            f"Is the server running at {BASE_URL}? Error: {e}"
-        )
-    # Let HTTPError and other exceptions propagate for test assertions
-
-
-def get_superuser_auth_headers() -> dict[str, str]:
-    """Get auth headers for the default superuser."""
-    return get_auth_headers(SUPERUSER_EMAIL, SUPERUSER_PASSWORD)
-
+from api_helpers import (
+    api,
+    get_auth_headers,
+    get_superuser_auth_headers,
+    random_email,
+    random_lower_string,
+)
+from config import SUPERUSER_EMAIL, SUPERUSER_PASSWORD
 
-def create_user_and_get_headers(
-    full_name: str, email: str, password: str
-) -> dict[str, str]:
-    """Helper to register a new user and return their auth headers."""
-    user_payload = {"full_name": full_name, "email": email, "password": password}
-    response = requests.post(f"{BASE_URL}{API_V1_STR}/users/signup", json=user_payload)
-    assert response.status_code == 200, f"Failed to sign up user {email}"
-    return get_auth_headers(email, password)
+pytestmark = pytest.mark.usefixtures("api_backend")
 
 @pytest.mark.integration
 class TestAPI:
@@ -65,7 +18,8 @@ class TestAPI:
     # Test Case 1: Superuser Login
     def test_superuser_login(self):
         """Tests that the superuser can log in and receive an access token."""
-        headers = get_superuser_auth_headers()
+        # Log in for real; get_superuser_auth_headers() may hand back the token minted at warm-up.
+        headers = get_auth_headers(SUPERUSER_EMAIL, SUPERUSER_PASSWORD)
         assert "Authorization" in headers
         assert headers["Authorization"].startswith("Bearer ")
 
@@ -80,19 +34,18 @@ class TestAPI:
     def test_superuser_can_read_users(self):
         """Tests that a superuser can access the admin endpoint to list all users."""
         headers = get_superuser_auth_headers()
-        response = requests.get(f"{BASE_URL}{API_V1_STR}/users/", headers=headers)
+        response = api.get("/users/", headers=headers)
         assert response.status_code == 200
         data = response.json()
         assert "data" in data and isinstance(data["data"], list)
         assert "count" in data
 
     # Test Case 4: Normal User Cannot Access Admin Endpoints
-    def test_normal_user_cannot_read_users(self):
+    def test_normal_user_cannot_read_users(self, fresh_user):
         """Tests that a regular user is forbidden from listing all users."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Normal User", email, password)
+        headers = fresh_user.headers
 
-        response = requests.get(f"{BASE_URL}{API_V1_STR}/users/", headers=headers)
+        response = api.get("/users/", headers=headers)
         assert response.status_code == 403
         assert response.json()["detail"] == "The user doesn't have enough privileges"
 
@@ -107,8 +60,8 @@ class TestAPI:
             "full_name": "Created by Admin",
         }
 
-        response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/users/", headers=headers, json=payload
+        response = api.post(
+            "/users/", headers=headers, json=payload
         )
         assert response.status_code == 200
         data = response.json()
@@ -121,65 +74,56 @@ class TestAPI:
         email, password, full_name = random_email(), random_lower_string(), "New Signee"
         payload = {"email": email, "password": password, "full_name": full_name}
 
-        response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/users/signup", json=payload
+        response = api.post(
+            "/users/signup", json=payload
         )
         assert response.status_code == 200
         data = response.json()
         assert data["email"] == email
 
     # Test Case 7: Reading Own User Profile
-    def test_user_can_read_own_profile(self):
+    def test_user_can_read_own_profile(self, fresh_user):
         """Tests that an authenticated user can read their own profile via /users/me."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Profile User", email, password)
+        email = fresh_user.email
+        headers = fresh_user.headers
 
-        response = requests.get(f"{BASE_URL}{API_V1_STR}/users/me", headers=headers)
+        response = api.get("/users/me", headers=headers)
         assert response.status_code == 200
         data = response.json()
         assert data["email"] == email
 
     # Test Case 8: Updating Own User Profile
-    def test_user_can_update_own_profile(self):
+    def test_user_can_update_own_profile(self, fresh_user):
         """Tests that a user can update their full_name via /users/me."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Original Name", email, password)
+        headers = fresh_user.headers
 
         payload = {"full_name": "Updated Name"}
-        response = requests.patch(
-            f"{BASE_URL}{API_V1_STR}/users/me", headers=headers, json=payload
+        response = api.patch(
+            "/users/me", headers=headers, json=payload
         )
         assert response.status_code == 200
         assert response.json()["full_name"] == "Updated Name"
 
     # Test Case 9: Superuser Can Delete a User
-    def test_superuser_can_delete_user(self):
+    def test_superuser_can_delete_user(self, fresh_user):
         """Tests that a superuser can delete another user."""
-        email, password = random_email(), random_lower_string()
-        create_user_and_get_headers("User To Delete", email, password)
+        user_id = fresh_user.id
 
         admin_headers = get_superuser_auth_headers()
-        users_response = requests.get(
-            f"{BASE_URL}{API_V1_STR}/users/?limit=1000", headers=admin_headers
-        )
-        user_to_delete = next(
-            u for u in users_response.json()["data"] if u["email"] == email
-        )
-        user_id = user_to_delete["id"]
 
-        response = requests.delete(
-            f"{BASE_URL}{API_V1_STR}/users/{user_id}", headers=admin_headers
+        response = api.delete(
+            f"/users/{user_id}", headers=admin_headers
         )
         assert response.status_code == 200
         assert response.json()["message"] == "User deleted successfully"
 
     # Test Case 10: User Can Delete Their Own Account
-    def test_user_can_delete_self(self):
+    def test_user_can_delete_self(self, fresh_user):
         """Tests that a regular user can delete their own account via /users/me."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Self Destruct", email, password)
+        email, password = fresh_user.email, fresh_user.password
+        headers = fresh_user.headers
 
-        response = requests.delete(f"{BASE_URL}{API_V1_STR}/users/me", headers=headers)
+        response = api.delete("/users/me", headers=headers)
         assert response.status_code == 200
         assert response.json()["message"] == "User deleted successfully"
 
@@ -188,14 +132,13 @@ class TestAPI:
             get_auth_headers(email, password)
 
     # Test Case 11: Create Item
-    def test_user_can_create_item(self):
+    def test_user_can_create_item(self, fresh_user):
         """Tests that an authenticated user can create a new item."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Item Creator", email, password)
+        headers = fresh_user.headers
 
         payload = {"title": "My First Item", "description": "This is a test item."}
-        response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/", headers=headers, json=payload
+        response = api.post(
+            "/items/", headers=headers, json=payload
         )
         assert response.status_code == 200
         data = response.json()
@@ -203,38 +146,36 @@ class TestAPI:
         assert "id" in data
 
     # Test Case 12: Read Items (Own Items)
-    def test_user_can_read_own_items(self):
+    def test_user_can_read_own_items(self, fresh_user):
         """Tests that a user can retrieve a list of their own items."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Item Lister", email, password)
+        headers = fresh_user.headers
 
         # Create an item first
-        requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/", headers=headers, json={"title": "Item 1"}
+        api.post(
+            "/items/", headers=headers, json={"title": "Item 1"}
         )
 
-        response = requests.get(f"{BASE_URL}{API_V1_STR}/items/", headers=headers)
+        response = api.get("/items/", headers=headers)
         assert response.status_code == 200
         data = response.json()
         assert data["count"] >= 1
         assert data["data"][0]["title"] == "Item 1"
 
     # Test Case 13: Update Item
-    def test_user_can_update_own_item(self):
+    def test_user_can_update_own_item(self, fresh_user):
         """Tests that a user can update an item they own."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Item Updater", email, password)
+        headers = fresh_user.headers
 
-        create_response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/",
+        create_response = api.post(
+            "/items/",
             headers=headers,
             json={"title": "Original Title"},
         )
         item_id = create_response.json()["id"]
 
         update_payload = {"title": "Updated Title"}
-        response = requests.put(
-            f"{BASE_URL}{API_V1_STR}/items/{item_id}",
+        response = api.put(
+            f"/items/{item_id}",
             headers=headers,
             json=update_payload,
         )
@@ -242,20 +183,19 @@ class TestAPI:
         assert response.json()["title"] == "Updated Title"
 
     # Test Case 14: Delete Item
-    def test_user_can_delete_own_item(self):
+    def test_user_can_delete_own_item(self, fresh_user):
         """Tests that a user can delete an item they own."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Item Deleter", email, password)
+        headers = fresh_user.headers
 
-        create_response = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/",
+        create_response = api.post(
+            "/items/",
             headers=headers,
             json={"title": "To Be Deleted"},
         )
         item_id = create_response.json()["id"]
 
-        response = requests.delete(
-            f"{BASE_URL}{API_V1_STR}/items/{item_id}", headers=headers
+        response = api.delete(
+            f"/items/{item_id}", headers=headers
         )
         assert response.status_code == 200
         assert response.json()["message"] == "Item deleted successfully"
@@ -263,7 +203,7 @@ class TestAPI:
     # Test Case 15: Health Check Endpoint
     def test_health_check(self):
         """Tests the public health check endpoint."""
-        response = requests.get(f"{BASE_URL}{API_V1_STR}/utils/health-check/")
+        response = api.get("/utils/health-check/")
         assert response.status_code == 200
         assert response.json() is True
 
@@ -276,15 +216,15 @@ class TestAPI:
         for _ in range(10):
             email, password = random_email(), random_lower_string()
             payload = {"email": email, "password": password, "full_name": "Paginate User"}
-            resp = requests.post(f"{BASE_URL}{API_V1_STR}/users/", headers=headers, json=payload)
+            resp = api.post("/users/", headers=headers, json=payload)
             assert resp.status_code == 200
             emails.append(email)
         # Get first 5 users
-        resp1 = requests.get(f"{BASE_URL}{API_V1_STR}/users/?limit=5&skip=0", headers=headers)
+        resp1 = api.get("/users/?limit=5&skip=0", headers=headers)
         assert resp1.status_code == 200
         data1 = resp1.json()["data"]
         # Get next 5 users
-        resp2 = requests.get(f"{BASE_URL}{API_V1_STR}/users/?limit=5&skip=5", headers=headers)
+        resp2 = api.get("/users/?limit=5&skip=5", headers=headers)
         assert resp2.status_code == 200
         data2 = resp2.json()["data"]
         assert len(data1) == 5
@@ -298,40 +238,36 @@ class TestAPI:
         """A superuser should not be able to delete their own account even by specifying their ID in the URL."""
         headers = get_superuser_auth_headers()
         # Get superuser's own ID
-        resp = requests.get(f"{BASE_URL}{API_V1_STR}/users/me", headers=headers)
+        resp = api.get("/users/me", headers=headers)
         assert resp.status_code == 200
         user_id = resp.json()["id"]
         # Attempt to delete self by ID
-        resp = requests.delete(f"{BASE_URL}{API_V1_STR}/users/{user_id}", headers=headers)
+        resp = api.delete(f"/users/{user_id}", headers=headers)
         assert resp.status_code == 403
         assert "Super users are not allowed to delete themselves" in resp.json().get("detail", "")
 
     # TC83: Cascade Delete of Items on User Deletion
-    def test_cascade_delete_items_on_user_deletion(self):
+    def test_cascade_delete_items_on_user_deletion(self, fresh_user):
         """When a user is deleted, all items owned by that user should also be deleted."""
         # Create user and items
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Cascade Owner", email, password)
+        headers = fresh_user.headers
         item_ids = []
         for i in range(3):
-            resp = requests.post(
-                f"{BASE_URL}{API_V1_STR}/items/",
+            resp = api.post(
+                "/items/",
                 headers=headers,
                 json={"title": f"Cascade Item {i}", "description": "To be deleted"},
             )
             assert resp.status_code == 200
             item_ids.append(resp.json()["id"])
-        # Get user id
         admin_headers = get_superuser_auth_headers()
-        users_resp = requests.get(f"{BASE_URL}{API_V1_STR}/users/?limit=1000", headers=admin_headers)
-        user = next(u for u in users_resp.json()["data"] if u["email"] == email)
-        user_id = user["id"]
+        user_id = fresh_user.id
         # Delete user
-        del_resp = requests.delete(f"{BASE_URL}{API_V1_STR}/users/{user_id}", headers=admin_headers)
+        del_resp = api.delete(f"/users/{user_id}", headers=admin_headers)
         assert del_resp.status_code == 200
         # Check items are deleted
         for item_id in item_ids:
-            get_resp = requests.get(f"{BASE_URL}{API_V1_STR}/items/{item_id}", headers=admin_headers)
+            get_resp = api.get(f"/items/{item_id}", headers=admin_headers)
             assert get_resp.status_code == 404
 
     # TC84: Test User Creation with an Invalid Email Format
@@ -343,57 +279,50 @@ class TestAPI:
             "password": "password123",
             "full_name": "Invalid Email"
         }
-        resp = requests.post(f"{BASE_URL}{API_V1_STR}/users/", headers=headers, json=payload)
+        resp = api.post("/users/", headers=headers, json=payload)
         assert resp.status_code == 422
 
     # TC85: Non-Superuser Attempt to Update Another User
-    def test_non_superuser_cannot_update_another_user(self):
+    def test_non_superuser_cannot_update_another_user(self, user_pool):
         """A regular user should not have permission to modify another user's data."""
-        # Create two users
-        email_a, password_a = random_email(), random_lower_string()
-        email_b, password_b = random_email(), random_lower_string()
-        headers_a = create_user_and_get_headers("User A", email_a, password_a)
-        headers_b = create_user_and_get_headers("User B", email_b, password_b)
-        # Get user B's id
-        admin_headers = get_superuser_auth_headers()
-        users_resp = requests.get(f"{BASE_URL}{API_V1_STR}/users/?limit=1000", headers=admin_headers)
-        user_b = next(u for u in users_resp.json()["data"] if u["email"] == email_b)
-        user_b_id = user_b["id"]
+        # Take two users
+        user_a, user_b = user_pool.claim(), user_pool.claim()
+        headers_a = user_a.headers
+        user_b_id = user_b.id
         # User A tries to update User B
-        resp = requests.patch(
-            f"{BASE_URL}{API_V1_STR}/users/{user_b_id}",
+        resp = api.patch(
+            f"/users/{user_b_id}",
             headers=headers_a,
             json={"full_name": "Hacked Name"}
         )
         assert resp.status_code == 403
 
     # TC86: Create Item with Missing Title
-    def test_create_item_missing_title(self):
+    def test_create_item_missing_title(self, fresh_user):
         """The `title` field is required when creating an item."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("No Title", email, password)
+        headers = fresh_user.headers
         payload = {"description": "Missing title"}
-        resp = requests.post(f"{BASE_URL}{API_V1_STR}/items/", headers=headers, json=payload)
+        resp = api.post("/items/", headers=headers, json=payload)
         assert resp.status_code == 422
 
     # TC87: Non-Superuser Cannot Update Another User's Item
-    def test_non_superuser_cannot_update_another_users_item(self):
+    def test_non_superuser_cannot_update_another_users_item(self, user_pool):
         """A user can't modify items they don't own."""
         # User A creates an item
-        email_a, password_a = random_email(), random_lower_string()
-        headers_a = create_user_and_get_headers("User A", email_a, password_a)
-        create_resp = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/",
+        user_a = user_pool.claim()
+        headers_a = user_a.headers
+        create_resp = api.post(
+            "/items/",
             headers=headers_a,
             json={"title": "User A's Item"}
         )
         item_id = create_resp.json()["id"]
         # User B tries to update User A's item
-        email_b, password_b = random_email(), random_lower_string()
-        headers_b = create_user_and_get_headers("User B", email_b, password_b)
+        user_b = user_pool.claim()
+        headers_b = user_b.headers
         update_payload = {"title": "Malicious Update"}
-        resp = requests.put(
-            f"{BASE_URL}{API_V1_STR}/items/{item_id}",
+        resp = api.put(
+            f"/items/{item_id}",
             headers=headers_b,
             json=update_payload
         )
@@ -401,44 +330,42 @@ class TestAPI:
         assert resp.json().get("detail") == "Not enough permissions"
 
     # TC88: Superuser Can Read Any Item
-    def test_superuser_can_read_any_item(self):
+    def test_superuser_can_read_any_item(self, fresh_user):
         """A superuser should have universal read access to all items."""
         # Regular user creates an item
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Item Owner", email, password)
-        create_resp = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/",
+        headers = fresh_user.headers
+        create_resp = api.post(
+            "/items/",
             headers=headers,
             json={"title": "Universal Read", "description": "Superuser should read this"}
         )
         item_id = create_resp.json()["id"]
         # Superuser reads the item
         admin_headers = get_superuser_auth_headers()
-        resp = requests.get(f"{BASE_URL}{API_V1_STR}/items/{item_id}", headers=admin_headers)
+        resp = api.get(f"/items/{item_id}", headers=admin_headers)
         assert resp.status_code == 200
         data = resp.json()
         assert data["id"] == item_id
         assert data["title"] == "Universal Read"
 
     # TC89: Item List Pagination for a Regular User
-    def test_item_list_pagination_for_regular_user(self):
+    def test_item_list_pagination_for_regular_user(self, fresh_user):
         """Ensure `limit` and `skip` parameters work correctly on GET /items/ for a regular user."""
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Paginator", email, password)
+        headers = fresh_user.headers
         # Create 10 items
         for i in range(10):
-            resp = requests.post(
-                f"{BASE_URL}{API_V1_STR}/items/",
+            resp = api.post(
+                "/items/",
                 headers=headers,
                 json={"title": f"Paginate Item {i}"}
             )
             assert resp.status_code == 200
         # Get first 5 items
-        resp1 = requests.get(f"{BASE_URL}{API_V1_STR}/items/?limit=5&skip=0", headers=headers)
+        resp1 = api.get("/items/?limit=5&skip=0", headers=headers)
         assert resp1.status_code == 200
         data1 = resp1.json()["data"]
         # Get next 5 items
-        resp2 = requests.get(f"{BASE_URL}{API_V1_STR}/items/?limit=5&skip=5", headers=headers)
+        resp2 = api.get("/items/?limit=5&skip=5", headers=headers)
         assert resp2.status_code == 200
         data2 = resp2.json()["data"]
         assert len(data1) == 5
@@ -448,39 +375,37 @@ class TestAPI:
         assert ids1.isdisjoint(ids2)
 
     # TC90: Superuser Can Delete Any Item
-    def test_superuser_can_delete_any_item(self):
+    def test_superuser_can_delete_any_item(self, fresh_user):
         """A superuser should have universal delete access."""
         # Regular user creates an item
-        email, password = random_email(), random_lower_string()
-        headers = create_user_and_get_headers("Delete Target", email, password)
-        create_resp = requests.post(
-            f"{BASE_URL}{API_V1_STR}/items/",
+        headers = fresh_user.headers
+        create_resp = api.post(
+            "/items/",
             headers=headers,
             json={"title": "Delete Me"}
         )
         item_id = create_resp.json()["id"]
         # Superuser deletes the item
         admin_headers = get_superuser_auth_headers()
-        resp = requests.delete(f"{BASE_URL}{API_V1_STR}/items/{item_id}", headers=admin_headers)
+        resp = api.delete(f"/items/{item_id}", headers=admin_headers)
         assert resp.status_code == 200
         assert resp.json()["message"] == "Item deleted successfully"
 
     # TC91: Access Protected Endpoint with Expired Token
-    def test_access_with_expired_token(self):
+    def test_access_with_expired_token(self, fresh_user):
         """The API should reject expired JSON Web Tokens."""
         # Create a user and get a token with a very short expiry
-        email, password = random_email(), random_lower_string()
-        create_user_and_get_headers("Expirer", email, password)
+        email, password = fresh_user.email, fresh_user.password
         # Manually request a token with 1 second expiry (assuming API supports it via extra param)
         login_data = {"username": email, "password": password, "expires_in": 1}
-        resp = requests.post(f"{BASE_URL}{API_V1_STR}/login/access-token", data=login_data)
+        resp = api.post("/login/access-token", data=login_data)
         assert resp.status_code == 200
         access_token = resp.json()["access_token"]
         headers = {"Authorization": f"Bearer {access_token}"}
         import time
         time.sleep(2)
         # Try to access a protected endpoint
-        resp = requests.get(f"{BASE_URL}{API_V1_STR}/users/me", headers=headers)
+        resp = api.get("/users/me", headers=headers)
         # NOTE: The backend does not support short-lived tokens, so this will always be 200
         assert resp.status_code == 200
 
@@ -488,7 +413,7 @@ class TestAPI:
     def test_password_recovery_nonexistent_email(self):
         """Password recovery endpoint should return a generic success message even if the email doesn't exist."""
         fake_email = f"noexist_{random_lower_string()}@test-api.com"
-        resp = requests.post(f"{BASE_URL}{API_V1_STR}/password-recovery/{fake_email}")
+        resp = api.post(f"/password-recovery/{fake_email}")
         # NOTE: The backend returns 404 for non-existent emails, so expect 404 here
         assert resp.status_code == 404
         # Optionally, check the error message
@@ -1,8 +1,9 @@
 import pytest
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from config import BASE_URL, SUPERUSER_EMAIL, SUPERUSER_PASSWORD
 from helpers import (
+    fill_form,
     login,
     login_as_superuser,
     random_email,
@@ -16,8 +17,6 @@ from helpers import (
 )
 from locators import Auth, General, Admin
 
-ACTIONS_MENU_BUTTON_LOCATOR = (By.CSS_SELECTOR, "td:last-child button")
-
 def find_user_row_by_email(driver, email):
     """
     Paginate through all admin user pages and return the row WebElement for the given email.
@@ -53,19 +52,19 @@ def find_user_row_by_email(driver, email):
     )
 
 @pytest.mark.admin
-def test_admin_page_is_inaccessible_to_regular_user(driver):
-    email, password = random_email(), random_string()
-    driver.get(f"{BASE_URL}/signup")
-    
-    wait_for(driver, Auth.FULL_NAME_INPUT).send_keys("Regular User")
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(email)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.SIGNUP_BUTTON).click()
-    print("Current URL after driver.get():", driver.current_url)
-    print("Title:", driver.title)
-    print("Page Source (short):", driver.page_source[:500]) 
-    login(driver, email, password, expect_success=False)
+def test_admin_page_is_inaccessible_to_regular_user(driver, browser_context, new_browser_context, fresh_user):
+    login_as_superuser(driver)
+    assert wait_for(driver, Admin.ADMIN_LINK).is_displayed()
+
+    # The regular user signs in from a second isolated context of the same Chrome
+    new_browser_context().activate()
+    login(driver, fresh_user.email, fresh_user.password)
+    assert not driver.find_elements(*Admin.ADMIN_LINK)
+
+    # The superuser's session in the first context is untouched
+    browser_context.activate()
+    driver.refresh()
+    assert wait_for(driver, Admin.ADMIN_LINK).is_displayed()
 
 @pytest.mark.admin
 def test_admin_page_loads_for_superuser(driver):
@@ -97,9 +96,11 @@ def test_add_user_successfully(driver):
     wait_for(driver, Admin.ADD_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(new_user_email)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
+    fill_form(driver, {
+        Auth.EMAIL_INPUT: new_user_email,
+        Auth.PASSWORD_INPUT: password,
+        Auth.CONFIRM_PASSWORD_INPUT: password,
+    })
     wait_for(driver, Admin.SAVE_BUTTON).click()
     
     wait_for(driver, General.TOAST_SUCCESS)
@@ -133,9 +134,11 @@ def test_add_superuser_successfully(driver):
     wait_for(driver, Admin.ADD_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(new_superuser_email)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
+    fill_form(driver, {
+        Auth.EMAIL_INPUT: new_superuser_email,
+        Auth.PASSWORD_INPUT: password,
+        Auth.CONFIRM_PASSWORD_INPUT: password,
+    })
     wait_for(driver, Admin.IS_SUPERUSER_CHECKBOX).click()
     wait_for(driver, Admin.SAVE_BUTTON).click()
     
@@ -184,9 +187,11 @@ def test_add_user_with_existing_email(driver):
     wait_for(driver, Admin.ADD_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(SUPERUSER_EMAIL)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
+    fill_form(driver, {
+        Auth.EMAIL_INPUT: SUPERUSER_EMAIL,
+        Auth.PASSWORD_INPUT: password,
+        Auth.CONFIRM_PASSWORD_INPUT: password,
+    })
     wait_for(driver, Admin.SAVE_BUTTON).click()
     
     wait_for(driver, General.TOAST_ERROR_TITLE)
@@ -199,7 +204,7 @@ def test_edit_user_dialog_opens(driver):
     
     rows = wait_for_all(driver, Admin.USERS_TABLE_ROW)
     target_row = next(row for row in rows if SUPERUSER_EMAIL not in row.text)
-    target_row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    target_row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Admin.EDIT_USER_BUTTON).click()
     
     assert "Edit User" in wait_for(driver, General.DIALOG_TITLE).text
@@ -215,20 +220,22 @@ def test_edit_user_details_successfully(driver):
     wait_for(driver, Admin.ADD_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(new_user_email)
     try:
-        wait_for(driver, Auth.FULL_NAME_INPUT).send_keys("Initial Name")
-    except TimeoutException:
+        fill_form(driver, {
+            Auth.EMAIL_INPUT: new_user_email,
+            Auth.FULL_NAME_INPUT: "Initial Name",
+            Auth.PASSWORD_INPUT: password,
+            Auth.CONFIRM_PASSWORD_INPUT: password,
+        })
+    except (TimeoutException, NoSuchElementException):
         print("DEBUG: FULL_NAME_INPUT not found. Page source:\n", driver.page_source)
         raise
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
     wait_for(driver, Admin.SAVE_BUTTON).click()
     
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
     row = find_user_row_by_email(driver, new_user_email)
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Admin.EDIT_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
@@ -250,15 +257,17 @@ def test_delete_user_successfully(driver):
     wait_for(driver, Admin.ADD_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(email_to_delete)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
+    fill_form(driver, {
+        Auth.EMAIL_INPUT: email_to_delete,
+        Auth.PASSWORD_INPUT: password,
+        Auth.CONFIRM_PASSWORD_INPUT: password,
+    })
     wait_for(driver, Admin.SAVE_BUTTON).click()
     
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
     row = find_user_row_by_email(driver, email_to_delete)
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Admin.DELETE_USER_BUTTON).click()
     
     wait_for(driver, General.DIALOG_TITLE)
@@ -284,9 +293,11 @@ def test_users_list_is_paginated(driver):
         wait_for(driver, Admin.ADD_USER_BUTTON).click()
         
         wait_for(driver, General.DIALOG_TITLE)
-        wait_for(driver, Auth.EMAIL_INPUT).send_keys(email)
-        wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-        wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
+        fill_form(driver, {
+            Auth.EMAIL_INPUT: email,
+            Auth.PASSWORD_INPUT: password,
+            Auth.CONFIRM_PASSWORD_INPUT: password,
+        })
         wait_for(driver, Admin.SAVE_BUTTON).click()
         
         wait_for(driver, General.TOAST_SUCCESS)
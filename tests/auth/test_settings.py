@@ -87,9 +87,8 @@ def test_update_email_with_invalid_format(driver):
     wait_for_text(driver, (By.TAG_NAME, "body"), "value is not a valid email address")
 
 @pytest.mark.settings
+@pytest.mark.read_only(route="/settings")
 def test_change_password_tab_loads(driver):
-    login_as_superuser(driver)
-    driver.get(f"{BASE_URL}/settings")
     wait_for(driver, Settings.PASSWORD_TAB).click()
     wait_for(driver, Auth.CURRENT_PASSWORD_INPUT)
     wait_for(driver, Auth.NEW_PASSWORD_INPUT)
@@ -148,9 +147,8 @@ def test_change_password_with_weak_new_password(driver):
     wait_for_text(driver, (By.TAG_NAME, "body"), "at least 8 characters")
 
 @pytest.mark.settings
+@pytest.mark.read_only(route="/settings")
 def test_appearance_tab_loads(driver):
-    login_as_superuser(driver)
-    driver.get(f"{BASE_URL}/settings")
     wait_for(driver, Settings.APPEARANCE_TAB).click()
     assert wait_for(driver, Settings.LIGHT_MODE_RADIO).is_displayed()
     assert wait_for(driver, Settings.DARK_MODE_RADIO).is_displayed()
@@ -175,22 +173,16 @@ def test_switch_to_light_mode(driver):
     assert "light" in html_tag.get_attribute("class")
 
 @pytest.mark.settings
+@pytest.mark.read_only(route="/settings")
 def test_danger_zone_tab_not_visible_for_superuser(driver):
-    login_as_superuser(driver)
-    driver.get(f"{BASE_URL}/settings")
     with pytest.raises(TimeoutException):
         wait_for(driver, Settings.DANGER_ZONE_TAB, timeout=2)
 
 @pytest.mark.settings
+@pytest.mark.read_only(route="/settings")
 def test_settings_tabs_are_visible(driver):
     """Verifies that all main tabs are visible on the user settings page."""
-    # 1. Log in
-    login_as_superuser(driver)
-    
-    # 2. Navigate to the settings page
-    driver.get(f"{BASE_URL}/settings")
-    
-    # 3. Assert each primary tab is displayed
+    # Assert each primary tab is displayed
     assert wait_for(driver, Settings.MY_PROFILE_TAB).is_displayed()
     assert wait_for(driver, Settings.PASSWORD_TAB).is_displayed()
     assert wait_for(driver, Settings.APPEARANCE_TAB).is_displayed()
@@ -0,0 +1,85 @@
+import math
+import time
+
+import pytest
+from selenium.webdriver.support import expected_conditions as EC
+
+from adaptive_waits import wait_until
+from api_helpers import get_superuser_auth_headers
+from bench import fit_growth, get, int_list, measure_ms, remove_users, seed_users
+from config import BASE_URL
+from helpers import login_as_superuser, wait_for, wait_for_all
+from locators import Admin, General
+
+PER_PAGE = 5
+RENDER_TIMEOUT = 60
+
+
+def render_ms(driver, action):
+    """Time from `action()` until the users table shows rows."""
+    start = time.perf_counter()
+    action()
+    wait_for_all(driver, Admin.USERS_TABLE_ROW, timeout=RENDER_TIMEOUT)
+    return (time.perf_counter() - start) * 1000
+
+
+def next_page_ms(driver):
+    """Time from clicking 'next page' until the previous page's rows are replaced."""
+    first_row = wait_for_all(driver, Admin.USERS_TABLE_ROW, timeout=RENDER_TIMEOUT)[0]
+    start = time.perf_counter()
+    wait_for(driver, General.NEXT_PAGE_BUTTON).click()
+    wait_until(driver, EC.staleness_of(first_row), "replaced", Admin.USERS_TABLE_ROW, RENDER_TIMEOUT)
+    wait_for_all(driver, Admin.USERS_TABLE_ROW, timeout=RENDER_TIMEOUT)
+    return (time.perf_counter() - start) * 1000
+
+
+@pytest.mark.benchmark
+@pytest.mark.admin
+def test_admin_scaling_across_user_counts(driver, bench, request):
+    """/admin render and /users/ offset pagination latency as the user table grows."""
+    config = request.config
+    concurrency = config.getoption("bench_concurrency")
+    headers = get_superuser_auth_headers()
+    login_as_superuser(driver)
+    seeded = []
+    try:
+        for target in sorted(int_list(config.getoption("bench_user_counts"))):
+            users = seed_users(target, config.getoption("bench_seed"), concurrency, created=seeded)
+            last_page = math.ceil(users / PER_PAGE)
+
+            first_render = render_ms(driver, lambda: driver.get(f"{BASE_URL}/admin"))
+            next_page = [next_page_ms(driver) for _ in range(3)]
+            deep_jumps = {
+                page: render_ms(driver, lambda page=page: driver.get(f"{BASE_URL}/admin?page={page}"))
+                for page in sorted({last_page // 2, last_page})
+            }
+            api_latency = {}
+            for skip in sorted({0, users // 2, max(users - PER_PAGE, 0)}):
+                api_latency[skip] = measure_ms(lambda skip=skip: get(f"/users/?skip={skip}&limit={PER_PAGE}", headers))
+
+            point = bench.add(
+                users=users,
+                first_render_ms=first_render,
+                next_page_ms=sorted(next_page)[len(next_page) // 2],
+                deep_jump_ms={str(page): ms for page, ms in deep_jumps.items()},
+                last_page_ms=deep_jumps[last_page],
+                api_p50_ms={str(skip): s["p50"] for skip, s in api_latency.items()},
+                api_p95_ms={str(skip): s["p95"] for skip, s in api_latency.items()},
+                api_last_page_p50_ms=api_latency[max(api_latency)]["p50"],
+            )
+            print(
+                f"{users} users: first render {point['first_render_ms']:.0f} ms, next page {point['next_page_ms']:.0f} ms, "
+                f"deep jumps {point['deep_jump_ms']}, /users/ p50 by skip {point['api_p50_ms']}"
+            )
+    finally:
+        if not config.getoption("bench_keep_data"):
+            remove_users(seeded, concurrency)
+
+    if len(bench.points) < 2:
+        return
+    counts = [point["users"] for point in bench.points]
+    for metric in ("first_render_ms", "next_page_ms", "last_page_ms", "api_last_page_p50_ms"):
+        fit = fit_growth(counts, [point[metric] for point in bench.points])
+        bench.summary[metric] = fit
+        exponent = "n/a" if fit["exponent"] is None else f"{fit['exponent']:.2f}"
+        print(f"{metric}: {fit['slope'] * 10000:+.1f} ms per 10k users (r2 {fit['r2']:.2f}, exponent {exponent})")
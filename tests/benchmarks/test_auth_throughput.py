@@ -0,0 +1,64 @@
+import itertools
+import uuid
+
+import pytest
+
+from bench import bench_user, find_knee, int_list, ramp, remove_users
+
+
+def login(user, created):
+    def send(session, root, n):
+        return session.post(
+            f"{root}/login/access-token", data={"username": user["email"], "password": user["password"]}
+        )
+
+    return send
+
+
+def signup(user, created):
+    run, numbers = uuid.uuid4().hex[:8], itertools.count()
+
+    def send(session, root, n):
+        response = session.post(
+            f"{root}/users/signup",
+            json={"email": f"signup{next(numbers)}.{run}@stress.example.com", "password": "stresspass123"},
+        )
+        if response.status_code == 200:
+            created.append(response.json()["id"])
+        return response
+
+    return send
+
+
+@pytest.mark.benchmark
+@pytest.mark.auth
+@pytest.mark.parametrize("scenario", [login, signup], ids=lambda scenario: scenario.__name__)
+def test_auth_throughput_under_rising_concurrency(api_backend, bench, request, scenario):
+    """Requests per second and latency of login/signup per concurrency step, and where the knee is."""
+    config = request.config
+    user, _ = bench_user(config.getoption("bench_seed"))
+    created = []
+    try:
+        results = ramp(
+            scenario(user, created),
+            int_list(config.getoption("bench_concurrency_levels")),
+            config.getoption("bench_step_duration"),
+            label=scenario.__name__,
+        )
+    finally:
+        if not config.getoption("bench_keep_data"):
+            remove_users(created, config.getoption("bench_concurrency"))
+    for result in results:
+        bench.add(scenario=scenario.__name__, **result)
+    knee = find_knee(results)
+    peak = max(results, key=lambda result: result["per_s"])
+    bench.summary = {
+        "peak_per_s": peak["per_s"],
+        "peak_concurrency": peak["concurrency"],
+        "knee_concurrency": knee["concurrency"] if knee else None,
+        "knee_per_s": knee["per_s"] if knee else None,
+    }
+    if knee:
+        print(f"{scenario.__name__}: knee at {knee['concurrency']} clients, {knee['per_s']:.0f}/s")
+    else:
+        print(f"{scenario.__name__}: still scaling at {results[-1]['concurrency']} clients")
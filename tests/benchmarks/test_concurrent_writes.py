@@ -0,0 +1,54 @@
+import pytest
+
+from api_helpers import api, get_superuser_auth_headers
+from bench import bench_user_headers, int_list, ramp
+
+
+def update_same_item(headers, user_headers):
+    response = api.post("/items/", headers=headers, json={"title": "contended item", "description": "v0"})
+    response.raise_for_status()
+    item_id = response.json()["id"]
+
+    def send(session, root, n):
+        return session.put(
+            f"{root}/items/{item_id}", headers=headers, json={"title": f"contended item {n}", "description": f"v{n}"}
+        )
+
+    return send
+
+
+def update_same_user(headers, user_headers):
+    response = api.get("/users/me", headers=user_headers)
+    response.raise_for_status()
+    user_id = response.json()["id"]
+
+    def send(session, root, n):
+        return session.patch(f"{root}/users/{user_id}", headers=headers, json={"full_name": f"Contended {n}"})
+
+    return send
+
+
+def create_items_for_same_owner(headers, user_headers):
+    def send(session, root, n):
+        return session.post(f"{root}/items/", headers=user_headers, json={"title": f"burst {n}", "description": "x"})
+
+    return send
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("scenario", [update_same_item, update_same_user, create_items_for_same_owner],
+                         ids=lambda scenario: scenario.__name__)
+def test_concurrent_writers_on_one_resource(api_backend, bench, request, scenario):
+    """Throughput, latency and error/conflict rates as more clients write the same resource."""
+    config = request.config
+    send = scenario(get_superuser_auth_headers(), bench_user_headers(config.getoption("bench_seed")))
+    results = ramp(
+        send,
+        int_list(config.getoption("bench_concurrency_levels")),
+        config.getoption("bench_step_duration"),
+        label=scenario.__name__,
+    )
+    for result in results:
+        bench.add(scenario=scenario.__name__, **result)
+    peak = max(results, key=lambda result: result["per_s"])
+    bench.summary = {"peak_per_s": peak["per_s"], "peak_concurrency": peak["concurrency"]}
@@ -0,0 +1,46 @@
+import pytest
+
+from api_helpers import get_superuser_auth_headers
+from bench import bench_user, fit_growth, get, int_list, item_count, measure_ms, remove_users, seed_items, user_id
+
+SWEEP_POINTS = 10
+
+
+@pytest.mark.benchmark
+@pytest.mark.items
+@pytest.mark.parametrize("role", ["user", "superuser"])
+def test_items_pagination_latency_by_offset(api_backend, bench, request, role):
+    """/items/ latency and response size as `skip` sweeps from the first to the last page."""
+    config = request.config
+    seed = config.getoption("bench_seed")
+    # The items belong to a user of their own; the superuser lists them along with everyone else's.
+    _, owner_headers = bench_user(seed, "pagination")
+    headers = get_superuser_auth_headers() if role == "superuser" else owner_headers
+    try:
+        seed_items(owner_headers, config.getoption("bench_items"), seed, config.getoption("bench_concurrency"))
+        total = item_count(headers)
+
+        for limit in int_list(config.getoption("bench_limits")):
+            last = max(total - limit, 0)
+            skips = sorted({last * i // (SWEEP_POINTS - 1) for i in range(SWEEP_POINTS)})
+            latencies = []
+            for skip in skips:
+                sizes = []
+
+                def list_items(skip=skip):
+                    response = get(f"/items/?skip={skip}&limit={limit}", headers)
+                    sizes.append(len(response.content))
+
+                timing = measure_ms(list_items)
+                latencies.append(timing["p50"])
+                bench.add(role=role, items=total, limit=limit, skip=skip, bytes=sizes[-1], **timing)
+            fit = fit_growth(skips, latencies)
+            bench.summary[f"limit={limit}"] = fit
+            exponent = "n/a" if fit["exponent"] is None else f"{fit['exponent']:.2f}"
+            print(
+                f"{role}, limit {limit}: p50 {latencies[0]:.1f} ms at skip 0, {latencies[-1]:.1f} ms at skip {skips[-1]}; "
+                f"{fit['slope'] * 10000:.2f} ms per 10k rows skipped (r2 {fit['r2']:.2f}, exponent {exponent})"
+            )
+    finally:
+        if not config.getoption("bench_keep_data"):
+            remove_users([user_id(owner_headers)], 1)
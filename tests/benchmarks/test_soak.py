@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from bench import bench_user
+from config import BASE_URL
+from helpers import (
+    fill_form,
+    login,
+    logout,
+    open_row_menu,
+    random_string,
+    table_row,
+    wait_for,
+    wait_for_invisibility,
+    wait_for_toast_to_disappear,
+)
+from locators import Auth, General, Items, Settings
+from soak import SoakLog, first_line, growth, sample
+
+MAX_CONSECUTIVE_FAILURES = 5
+
+
+def recover(driver, user, log, iteration):
+    """Start over from a clean login after a failed flow; a failed recovery is logged and the next flow tries again."""
+    try:
+        driver.get(f"{BASE_URL}/login")
+        driver.execute_script("window.localStorage.clear();")
+        login(driver, user["email"], user["password"])
+    except WebDriverException as e:
+        log.write("recovery_failed", iteration=iteration, error=first_line(e))
+
+
+def relogin(driver, user):
+    logout(driver)
+    login(driver, user["email"], user["password"])
+
+
+def add_edit_delete_item(driver, user):
+    driver.get(f"{BASE_URL}/items")
+    title, updated = f"Soak Item {random_string()}", f"Soak Edited {random_string()}"
+    wait_for(driver, Items.ADD_ITEM_BUTTON).click()
+    wait_for(driver, General.DIALOG_TITLE)
+    fill_form(driver, {Items.TITLE_INPUT: title, Items.DESCRIPTION_INPUT: "soak"})
+    wait_for(driver, Items.SAVE_BUTTON).click()
+    wait_for(driver, General.TOAST_SUCCESS)
+    wait_for_toast_to_disappear(driver)
+    open_row_menu(driver, title)
+    wait_for(driver, Items.EDIT_ITEM_BUTTON).click()
+    fill_form(driver, {Items.TITLE_INPUT: updated})
+    wait_for(driver, Items.SAVE_BUTTON).click()
+    wait_for(driver, General.TOAST_SUCCESS)
+    wait_for_toast_to_disappear(driver)
+    open_row_menu(driver, updated)
+    wait_for(driver, Items.DELETE_ITEM_BUTTON).click()
+    wait_for(driver, Items.CONFIRM_DELETE_BUTTON).click()
+    wait_for(driver, General.TOAST_SUCCESS)
+    wait_for_invisibility(driver, table_row(updated))
+
+
+def change_settings(driver, user):
+    driver.get(f"{BASE_URL}/settings")
+    wait_for(driver, Settings.APPEARANCE_TAB).click()
+    wait_for(driver, Settings.DARK_MODE_RADIO).click()
+    wait_for(driver, Settings.LIGHT_MODE_RADIO).click()
+    wait_for(driver, Settings.MY_PROFILE_TAB).click()
+    wait_for(driver, Settings.EDIT_BUTTON).click()
+    fill_form(driver, {Auth.FULL_NAME_INPUT: f"Soak {random_string(4)}"})
+    wait_for(driver, Settings.SAVE_BUTTON).click()
+    wait_for(driver, General.TOAST_SUCCESS)
+    wait_for_toast_to_disappear(driver)
+
+
+FLOWS = (relogin, add_edit_delete_item, change_settings)
+
+
+@pytest.mark.benchmark
+def test_soak_ui_flows(driver, bench, request):
+    """Loops the UI flows in one browser and tracks resource growth over the run."""
+    config = request.config
+    duration = config.getoption("soak_duration")
+    every = config.getoption("soak_sample_every")
+    pid = config.getoption("soak_backend_pid")
+    user, _ = bench_user(config.getoption("bench_seed"), "soak")
+    log = SoakLog(config.getoption("soak_out"))
+    start = time.perf_counter()
+    log.write("start", test=request.node.nodeid, duration_s=duration, backend_pid=pid)
+    login(driver, user["email"], user["password"])
+    samples = [log.write("sample", iteration=0, elapsed_s=0.0, **sample(driver, pid))]
+    iteration = failures = consecutive = 0
+    next_sample = every
+    try:
+        while time.perf_counter() - start < duration:
+            iteration += 1
+            for flow in FLOWS:
+                try:
+                    flow(driver, user)
+                    consecutive = 0
+                except WebDriverException as e:
+                    failures += 1
+                    consecutive += 1
+                    log.write("failure", iteration=iteration, flow=flow.__name__, error=first_line(e))
+                    if consecutive >= MAX_CONSECUTIVE_FAILURES:
+                        pytest.fail(f"soak aborted after {consecutive} failed flows in a row ({flow.__name__}: {e})")
+                    recover(driver, user, log, iteration)
+            elapsed = time.perf_counter() - start
+            if elapsed >= next_sample:
+                next_sample = elapsed + every
+                samples.append(log.write("sample", iteration=iteration, elapsed_s=elapsed, **sample(driver, pid)))
+    finally:
+        report = growth(samples)
+        leaks = sorted(metric for metric, result in report.items() if result["leak"])
+        cdp_errors = sum("cdp_error" in s for s in samples)
+        log.write("end", iterations=iteration, failures=failures, cdp_errors=cdp_errors, growth=report, leaks=leaks)
+        log.close()
+        bench.points = samples
+        bench.summary = {
+            "iterations": iteration, "failures": failures, "cdp_errors": cdp_errors, "growth": report, "leaks": leaks,
+        }
+    for metric, result in report.items():
+        print(
+            f"{metric}: {result['start']:.0f} -> {result['end']:.0f}, {result['per_hour']:+.0f}/h "
+            f"(r2 {result['r2']:.2f}){'  LEAK' if result['leak'] else ''}"
+        )
@@ -2,7 +2,6 @@ import pytest
 from selenium.webdriver.common.by import By
 from config import BASE_URL
 from helpers import (
-    login_as_superuser,
     wait_for,
     wait_for_url_to_be,
 )
@@ -10,52 +9,49 @@ from locators import Dashboard, Navbar
 
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_dashboard_displays_welcome_message(driver):
-    login_as_superuser(driver)
-    
     assert "Hi, " in wait_for(driver, (By.XPATH, "//*[contains(text(), 'Hi,')]")).text
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_sidebar_navigation_to_items(driver):
-    login_as_superuser(driver)
     wait_for(driver, (By.XPATH, "//a[@href='/items']")).click()
     wait_for_url_to_be(driver, f"{BASE_URL}/items")
     
     assert wait_for(driver, (By.TAG_NAME, "h2")).text == "Items Management"
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_sidebar_navigation_to_settings(driver):
-    login_as_superuser(driver)
     wait_for(driver, (By.XPATH, "//a[@href='/settings']")).click()
     wait_for_url_to_be(driver, f"{BASE_URL}/settings")
     
     assert wait_for(driver, (By.TAG_NAME, "h2")).text == "User Settings"
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_navbar_user_menu_opens(driver):
-    login_as_superuser(driver)
     wait_for(driver, Navbar.USER_MENU).click()
     
     assert wait_for(driver, (By.XPATH, "//*[contains(text(), 'My Profile')]")).is_displayed()
     assert wait_for(driver, Navbar.LOGOUT_BUTTON).is_displayed()
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_404_page_for_invalid_route(driver):
-    login_as_superuser(driver)
     driver.get(f"{BASE_URL}/invalid-route")
     
     assert wait_for(driver, (By.XPATH, "//*[contains(text(), '404')]")).is_displayed()
 
 @pytest.mark.dashboard
+@pytest.mark.read_only(route="/")
 def test_navbar_and_user_menu_are_visible_after_login(driver):
     """Ensures the main navbar logo and the user menu button are visible after logging in."""
-    # 1. Log in as any user
-    login_as_superuser(driver)
-    
-    # 2. Assert the main logo in the navbar is displayed
+    # 1. Assert the main logo in the navbar is displayed
     logo = wait_for(driver, Navbar.NAVBAR_LOGO) # Assumes locator for the logo
     assert logo.is_displayed()
     
-    # 3. Assert the user menu button is displayed
+    # 2. Assert the user menu button is displayed
     user_menu = wait_for(driver, Navbar.USER_MENU)
     assert user_menu.is_displayed()
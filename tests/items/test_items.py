@@ -3,9 +3,9 @@ from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
 from config import BASE_URL
 from helpers import (
+    fill_form,
     login,
     login_as_superuser,
-    random_email,
     random_string,
     wait_for,
     wait_for_all,
@@ -14,9 +14,7 @@ from helpers import (
     wait_for_invisibility,
     wait_for_toast_to_disappear
 )
-from locators import Auth, Dashboard, General, Items
-
-ACTIONS_MENU_BUTTON_LOCATOR = (By.CSS_SELECTOR, "td:last-child button")
+from locators import Dashboard, General, Items
 
 @pytest.mark.items
 def test_add_item_dialog_opens_and_closes(driver):
@@ -50,8 +48,10 @@ def test_add_item_with_valid_data(driver):
     item_title = f"My Test Item {random_string()}"
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE) 
-    wait_for(driver, Items.TITLE_INPUT).send_keys(item_title)
-    wait_for(driver, Items.DESCRIPTION_INPUT).send_keys("A description")
+    fill_form(driver, {
+        Items.TITLE_INPUT: item_title,
+        Items.DESCRIPTION_INPUT: "A description",
+    })
     wait_for(driver, Items.SAVE_BUTTON).click()
     wait_for(driver, General.TOAST_SUCCESS)
     # Navigate to the last page to find the newly added item
@@ -76,21 +76,12 @@ def test_add_item_with_missing_title(driver):
     
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Items.DESCRIPTION_INPUT).send_keys("A description")
+    fill_form(driver, {Items.DESCRIPTION_INPUT: "A description"})
     assert not wait_for(driver, Items.SAVE_BUTTON).is_enabled()
 
 @pytest.mark.items
-def test_items_empty_state_is_shown(driver):
-    email, password = random_email(), random_string()
-    driver.get(f"{BASE_URL}/signup")
-    
-    wait_for(driver, Auth.FULL_NAME_INPUT).send_keys("Empty State User")
-    wait_for(driver, Auth.EMAIL_INPUT).send_keys(email)
-    wait_for(driver, Auth.PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.CONFIRM_PASSWORD_INPUT).send_keys(password)
-    wait_for(driver, Auth.SIGNUP_BUTTON).click()
-    import time; time.sleep(1)
-    login(driver, email, password)
+def test_items_empty_state_is_shown(driver, fresh_user):
+    login(driver, fresh_user.email, fresh_user.password)
     wait_for_url_to_be(driver, f"{BASE_URL}/")
     wait_for(driver, Dashboard.WELCOME_TEXT)
     driver.get(f"{BASE_URL}/items")
@@ -105,7 +96,7 @@ def test_edit_item_dialog_opens_with_data(driver):
     item_title = f"Edit Test Item {random_string()}"
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Items.TITLE_INPUT).send_keys(item_title)
+    fill_form(driver, {Items.TITLE_INPUT: item_title})
     wait_for(driver, Items.SAVE_BUTTON).click()
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
@@ -117,7 +108,7 @@ def test_edit_item_dialog_opens_with_data(driver):
         next_button.click()
         wait_for_toast_to_disappear(driver)
     row = wait_for(driver, (By.XPATH, f"//tr[td[contains(text(), '{item_title}')]]"))
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Items.EDIT_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
     assert wait_for(driver, Items.TITLE_INPUT).get_attribute("value") == item_title
@@ -131,7 +122,7 @@ def test_edit_item_successfully(driver):
     updated_title = f"Updated Title {random_string()}"
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Items.TITLE_INPUT).send_keys(item_title)
+    fill_form(driver, {Items.TITLE_INPUT: item_title})
     wait_for(driver, Items.SAVE_BUTTON).click()
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
@@ -143,7 +134,7 @@ def test_edit_item_successfully(driver):
         next_button.click()
         wait_for_toast_to_disappear(driver)
     row = wait_for(driver, (By.XPATH, f"//tr[td[contains(text(), '{item_title}')]]"))
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Items.EDIT_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
     title_input = wait_for(driver, Items.TITLE_INPUT)
@@ -161,7 +152,7 @@ def test_delete_item_confirmation(driver):
     item_title = f"Confirm Delete Item {random_string()}"
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Items.TITLE_INPUT).send_keys(item_title)
+    fill_form(driver, {Items.TITLE_INPUT: item_title})
     wait_for(driver, Items.SAVE_BUTTON).click()
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
@@ -173,7 +164,7 @@ def test_delete_item_confirmation(driver):
         next_button.click()
         wait_for_toast_to_disappear(driver)
     row = wait_for(driver, (By.XPATH, f"//tr[td[contains(text(), '{item_title}')]]"))
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Items.DELETE_ITEM_BUTTON).click()
     assert "Delete Item" in wait_for(driver, General.DIALOG_TITLE).text
 
@@ -185,7 +176,7 @@ def test_delete_item_successfully(driver):
     item_title = f"To Be Deleted {random_string()}"
     wait_for(driver, Items.ADD_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
-    wait_for(driver, Items.TITLE_INPUT).send_keys(item_title)
+    fill_form(driver, {Items.TITLE_INPUT: item_title})
     wait_for(driver, Items.SAVE_BUTTON).click()
     wait_for(driver, General.TOAST_SUCCESS)
     wait_for_toast_to_disappear(driver)
@@ -197,7 +188,7 @@ def test_delete_item_successfully(driver):
         next_button.click()
         wait_for_toast_to_disappear(driver)
     row = wait_for(driver, (By.XPATH, f"//tr[td[contains(text(), '{item_title}')]]"))
-    row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+    row.find_element(*General.ROW_ACTIONS_BUTTON).click()
     wait_for(driver, Items.DELETE_ITEM_BUTTON).click()
     wait_for(driver, General.DIALOG_TITLE)
     wait_for(driver, Items.CONFIRM_DELETE_BUTTON).click()
@@ -215,7 +206,7 @@ def test_items_pagination_appears(driver):
             if not rows:
                 break
             for row in rows:
-                row.find_element(*ACTIONS_MENU_BUTTON_LOCATOR).click()
+                row.find_element(*General.ROW_ACTIONS_BUTTON).click()
                 wait_for(driver, Items.DELETE_ITEM_BUTTON).click()
                 wait_for(driver, General.DIALOG_TITLE)
                 wait_for(driver, Items.CONFIRM_DELETE_BUTTON).click()
@@ -226,7 +217,7 @@ def test_items_pagination_appears(driver):
     for i in range(6):
         wait_for(driver, Items.ADD_ITEM_BUTTON).click()
         wait_for(driver, General.DIALOG_TITLE)
-        wait_for(driver, Items.TITLE_INPUT).send_keys(f"Pagination Item {i} {random_string()}")
+        fill_form(driver, {Items.TITLE_INPUT: f"Pagination Item {i} {random_string()}"})
         wait_for(driver, Items.SAVE_BUTTON).click()
         wait_for(driver, General.TOAST_SUCCESS)
         wait_for_toast_to_disappear(driver)
@@ -241,7 +232,7 @@ def test_items_pagination_navigation(driver):
     for i in range(6 - initial_rows):
         wait_for(driver, Items.ADD_ITEM_BUTTON).click()
         wait_for(driver, General.DIALOG_TITLE)
-        wait_for(driver, Items.TITLE_INPUT).send_keys(f"Nav Item {i}")
+        fill_form(driver, {Items.TITLE_INPUT: f"Nav Item {i}"})
         wait_for(driver, Items.SAVE_BUTTON).click()
         wait_for_toast_to_disappear(driver)
 
@@ -0,0 +1,125 @@
+"""
+Local SQLite store of timings from past runs, under .perf/.
+
+Only the controlling pytest process writes, once, at the end of the session;
+xdist workers send what they measured back to it. Whatever has to be the same on
+every worker of a run, such as the test order, is read by the controlling
+process at start-up and handed to the workers instead of read by each of them.
+"""
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).parent / ".perf" / "timings.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    workers INTEGER NOT NULL,
+    wall_s REAL
+);
+CREATE TABLE IF NOT EXISTS test_durations (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    nodeid TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration_s REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_durations_nodeid ON test_durations (nodeid, run_id);
+CREATE TABLE IF NOT EXISTS wait_samples (
+    id INTEGER PRIMARY KEY,
+    route TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wait_samples_key ON wait_samples (route, kind, target, id);
+"""
+
+# Runs of history an estimate is based on; older rows are pruned.
+KEEP_RUNS = 20
+# Most recent samples kept per waited-for locator and route.
+KEEP_WAIT_SAMPLES = 200
+
+
+class TimingStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+
+    @contextmanager
+    def connect(self):
+        """A connection with the schema in place; commits on success and is closed on exit."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.executescript(SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save_run(self, workers, wall_s, durations, started=None):
+        """Store one run; durations is an iterable of (nodeid, worker, outcome, seconds)."""
+        with self.connect() as connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (started, workers, wall_s) VALUES (?, ?, ?)",
+                (started or time.time(), workers, wall_s),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO test_durations (run_id, nodeid, worker, outcome, duration_s) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in durations],
+            )
+            connection.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)", (KEEP_RUNS,)
+            )
+            connection.execute("DELETE FROM test_durations WHERE run_id NOT IN (SELECT id FROM runs)")
+        return run_id
+
+    def test_estimates(self, last=5):
+        """Mean duration of each test over its `last` most recent runs, skipped runs excluded."""
+        if not self.path.exists():
+            return {}
+        with self.connect() as connection:
+            rows = connection.execute(
+                """
+                SELECT nodeid, AVG(duration_s) FROM (
+                    SELECT nodeid, duration_s,
+                           ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY run_id DESC) AS age
+                    FROM test_durations WHERE outcome != 'skipped'
+                ) WHERE age <= ? GROUP BY nodeid
+                """,
+                (last,),
+            ).fetchall()
+        return dict(rows)
+
+    def save_wait_samples(self, samples):
+        """samples: iterable of (route, kind, target, seconds)."""
+        with self.connect() as connection:
+            connection.executemany(
+                "INSERT INTO wait_samples (route, kind, target, seconds) VALUES (?, ?, ?, ?)", list(samples)
+            )
+            connection.execute(
+                """
+                DELETE FROM wait_samples WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY route, kind, target ORDER BY id DESC) AS age
+                        FROM wait_samples
+                    ) WHERE age > ?
+                )
+                """,
+                (KEEP_WAIT_SAMPLES,),
+            )
+
+    def wait_samples(self):
+        """Recorded wait times as {(route, kind, target): [seconds, ...]}."""
+        if not self.path.exists():
+            return {}
+        samples = {}
+        with self.connect() as connection:
+            for route, kind, target, seconds in connection.execute(
+                "SELECT route, kind, target, seconds FROM wait_samples ORDER BY id"
+            ):
+                samples.setdefault((route, kind, target), []).append(seconds)
+        return samples
@@ -0,0 +1,279 @@
+"""
+Chrome trace-event export of a test run.
+
+Run with `--trace-events=trace.json` and open the file in Perfetto or
+chrome://tracing. Every pytest process (the main run or an xdist worker) gets a
+track with test phases, helper calls and `requests` traffic nested in it; every
+browser gets a track with the WebDriver commands sent to it plus the page
+navigations and fetches the browser itself recorded. All timestamps are on the
+wall clock, so browser-side Performance API entries line up with test-side spans.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from config import WORKER_ID
+from driver_hooks import add_command_hook
+
+WEBDRIVER_TID = 1
+NAVIGATION_TID = 2
+RESOURCES_TID = 3
+
+_CLOCK_OFFSET = time.time() - time.perf_counter()
+
+_HARVEST_SCRIPT = """
+return {
+    origin: performance.timeOrigin,
+    entries: performance.getEntries()
+        .filter(e => e.entryType === 'navigation' || e.entryType === 'resource')
+        .map(e => ({
+            type: e.entryType,
+            name: e.name,
+            start: e.startTime,
+            duration: e.duration,
+            initiator: e.initiatorType || '',
+            size: e.transferSize || 0
+        }))
+};
+"""
+
+
+def now_us():
+    """Current wall-clock time in microseconds, with perf_counter resolution."""
+    return (time.perf_counter() + _CLOCK_OFFSET) * 1_000_000
+
+
+class Tracer:
+    """Collects trace events for the current process."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._named_threads = set()
+        self._async_ids = 0
+        self._metadata("process_name", self.pid, 0, f"pytest {WORKER_ID}")
+
+    def _metadata(self, kind, pid, tid, name):
+        self.events.append({"name": kind, "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+
+    def _current_tid(self):
+        thread = threading.current_thread()
+        tid = 1 if thread is threading.main_thread() else thread.native_id
+        if tid not in self._named_threads:
+            self._named_threads.add(tid)
+            self._metadata("thread_name", self.pid, tid, "pytest" if tid == 1 else thread.name)
+        return tid
+
+    def name_process(self, pid, name, threads):
+        with self._lock:
+            self._metadata("process_name", pid, 0, name)
+            for tid, thread_name in threads.items():
+                self._metadata("thread_name", pid, tid, thread_name)
+
+    def complete(self, name, cat, ts, dur, pid=None, tid=None, args=None):
+        event = {"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur}
+        with self._lock:
+            event["pid"] = self.pid if pid is None else pid
+            event["tid"] = self._current_tid() if tid is None else tid
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def interval(self, name, cat, ts, dur, pid, tid, args=None):
+        """Record a span that may overlap its siblings (rendered as an async slice)."""
+        with self._lock:
+            self._async_ids += 1
+            common = {"name": name, "cat": cat, "id": self._async_ids, "pid": pid, "tid": tid}
+            self.events.append({**common, "ph": "b", "ts": ts, "args": args or {}})
+            self.events.append({**common, "ph": "e", "ts": ts + dur})
+
+    @contextmanager
+    def span(self, name, cat, args=None):
+        """Time the enclosed block; yields a dict the block may add args to."""
+        args = dict(args or {})
+        start = now_us()
+        try:
+            yield args
+        finally:
+            self.complete(name, cat, start, now_us() - start, args=args)
+
+    def write(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
+
+
+def traced(func):
+    """Record each call of a helper as a span on the calling thread's track."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not tracer.enabled:
+            return func(*args, **kwargs)
+        with tracer.span(func.__name__, "helper"):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class _BrowserTrack:
+    _count = 0
+
+    def __init__(self, driver):
+        _BrowserTrack._count += 1
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        self.pid = process.pid if process else tracer.pid * 1000 + _BrowserTrack._count
+        self.origin = None
+        self.harvested = 0
+        tracer.name_process(self.pid, f"browser {_BrowserTrack._count} ({WORKER_ID})", {
+            WEBDRIVER_TID: "webdriver",
+            NAVIGATION_TID: "navigations",
+            RESOURCES_TID: "fetches",
+        })
+
+    def harvest(self, driver):
+        """Copy the page's navigation and resource timings into the trace, once each."""
+        try:
+            timings = driver.execute_script(_HARVEST_SCRIPT)
+        except WebDriverException:
+            return
+        if timings["origin"] != self.origin:
+            self.origin, self.harvested = timings["origin"], 0
+        entries = timings["entries"][self.harvested:]
+        self.harvested += len(entries)
+        for entry in entries:
+            ts = (self.origin + entry["start"]) * 1000
+            dur = entry["duration"] * 1000
+            args = {"url": entry["name"], "transfer_size": entry["size"]}
+            if entry["type"] == "navigation":
+                tracer.complete(urlsplit(entry["name"]).path or entry["name"], "navigation",
+                                ts, dur, pid=self.pid, tid=NAVIGATION_TID, args=args)
+            else:
+                tracer.interval(urlsplit(entry["name"]).path or entry["name"], entry["initiator"],
+                                ts, dur, pid=self.pid, tid=RESOURCES_TID, args=args)
+
+
+def pytest_driver_created(driver, request):
+    """Trace every WebDriver command of `driver` and the browser's own page timings."""
+    if not tracer.enabled:
+        return
+    track = _BrowserTrack(driver)
+
+    def hook(driver, command, params, execute):
+        if command in (Command.GET, Command.QUIT):
+            track.harvest(driver)
+        args = {}
+        if command == Command.GET:
+            args["url"] = params["url"]
+        elif command in (Command.FIND_ELEMENT, Command.FIND_ELEMENTS):
+            args["locator"] = f"{params['using']}={params['value']}"
+        start = now_us()
+        try:
+            return execute(command, params)
+        finally:
+            tracer.complete(command, "webdriver", start, now_us() - start,
+                            pid=track.pid, tid=WEBDRIVER_TID, args=args)
+
+    add_command_hook(driver, hook)
+
+
+def _traced_send(send):
+    @functools.wraps(send)
+    def wrapper(session, request, **kwargs):
+        with tracer.span(f"{request.method} {urlsplit(request.url).path}", "http",
+                         {"url": request.url}) as args:
+            response = send(session, request, **kwargs)
+            args["status"] = response.status_code
+            return response
+    wrapper.untraced = send
+    return wrapper
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--trace-events", metavar="PATH", default=None,
+        help="write the run as Chrome trace-event JSON to PATH (open in Perfetto or chrome://tracing)",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("trace_events"):
+        tracer.enabled = True
+        requests.Session.send = _traced_send(requests.Session.send)
+
+
+def pytest_unconfigure(config):
+    if tracer.enabled:
+        requests.Session.send = requests.Session.send.untraced
+        tracer.enabled = False
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if not tracer.enabled:
+        yield
+        return
+    with tracer.span(item.nodeid, "test"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    if not tracer.enabled:
+        yield
+        return
+    with tracer.span("setup", "pytest"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    if not tracer.enabled:
+        yield
+        return
+    with tracer.span("call", "pytest"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    if not tracer.enabled:
+        yield
+        return
+    with tracer.span("teardown", "pytest"):
+        yield
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    tracer.events.extend(getattr(node, "workeroutput", {}).get("trace_events", []))
+
+
+def pytest_sessionfinish(session):
+    if not tracer.enabled:
+        return
+    config = session.config
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["trace_events"] = tracer.events
+    else:
+        tracer.write(config.getoption("trace_events"))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if tracer.enabled and not hasattr(config, "workeroutput"):
+        terminalreporter.write_line(f"trace events written to {config.getoption('trace_events')}")
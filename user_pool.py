@@ -0,0 +1,172 @@
+"""
+Pool of pre-created ordinary users.
+
+Tests that only need "some fresh user" take `fresh_user` (or call
+`user_pool.claim()` for more than one) instead of signing up and logging in
+inline. The pool signs up a batch of users concurrently the first time it is
+used, each with an access token already minted; a claim is a deque pop, and once
+the pool drops to its low-water mark a background refill tops it back up. Every
+user is handed out once, so tests still get a pristine account. If the pool is
+ever empty the user is created inline. A user that cannot be created fails the
+initial fill outright; a failed background refill is counted and warned about.
+
+UI tests (those using `driver`) get their `fresh_user` from `ui_user_pool`,
+which always creates users on the real backend at API_BASE_URL: the frontend
+talks to that backend, so a user that exists only in the stand-in backend of
+`--api-backend=stub` could not log in.
+
+With --api-cassettes the pool is bypassed and users are created inline through
+the shared client, so the signup and login stay in the test's cassette.
+"""
+import threading
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from api_helpers import ApiSession, api, note_endpoint, random_email, random_lower_string
+from config import API_BASE_URL
+
+
+@dataclass
+class PooledUser:
+    id: str
+    email: str
+    password: str
+    full_name: str
+    headers: dict
+
+
+def create_user(session, full_name="Pooled User"):
+    """Sign up a user through `session` and log it in."""
+    email, password = random_email(), random_lower_string()
+    response = session.post("/users/signup", json={"full_name": full_name, "email": email, "password": password})
+    assert response.status_code == 200, f"Failed to sign up user {email}: {response.status_code} {response.text}"
+    user_id = response.json()["id"]
+    response = session.post("/login/access-token", data={"username": email, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return PooledUser(user_id, email, password, full_name, headers)
+
+
+class UserPool:
+    def __init__(self, base_url, size=16, low_water=None, workers=8):
+        self.size = size
+        self.low_water = size // 4 if low_water is None else low_water
+        self.session = ApiSession(base_url)
+        self.users = deque()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="user-pool")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.claimed = 0
+        self.created_inline = 0
+        self.failed = 0
+
+    def _add_one(self):
+        try:
+            self.users.append(create_user(self.session))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _check(self, future):
+        if future.cancelled() or future.exception() is None:
+            return
+        with self._lock:
+            self.failed += 1
+        warnings.warn(f"user pool could not create a user: {future.exception()}")
+
+    def refill(self, background=True):
+        """Start creating users until the pool (with in-flight creations) is back at full size."""
+        with self._lock:
+            missing = self.size - len(self.users) - self._pending
+            self._pending += max(missing, 0)
+        futures = [self.executor.submit(self._add_one) for _ in range(missing)]
+        if background:
+            for future in futures:
+                future.add_done_callback(self._check)
+        return futures
+
+    def fill(self):
+        """Fill the pool and wait for it; raises the first creation failure."""
+        for future in self.refill(background=False):
+            future.result()
+        return self
+
+    def claim(self):
+        """An unused user; never handed out twice."""
+        with self._lock:
+            self.claimed += 1
+        try:
+            user = self.users.popleft()
+            # Created ahead of time on a pool thread; count it as this test's signup and login.
+            note_endpoint("POST /users/signup")
+            note_endpoint("POST /login/access-token")
+        except IndexError:
+            with self._lock:
+                self.created_inline += 1
+            user = create_user(self.session)
+        if len(self.users) <= self.low_water:
+            self.refill()
+        return user
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+class InlineUsers:
+    """Stand-in for the pool that creates each user on demand (through the shared client by default)."""
+
+    def __init__(self, session=api):
+        self.session = session
+        self.claimed = 0
+        self.created_inline = 0
+
+    def claim(self):
+        self.claimed += 1
+        self.created_inline += 1
+        return create_user(self.session)
+
+    def close(self):
+        pass
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("user pool")
+    group.addoption(
+        "--user-pool-size", type=int, default=16,
+        help="users created up front per process for tests that need a fresh one; 0 creates them inline (default: 16)",
+    )
+
+
+def start_pool(config, base_url, inline, session=api):
+    size = config.getoption("user_pool_size")
+    if size <= 0 or inline:
+        return InlineUsers(session)
+    return UserPool(base_url, size=size).fill()
+
+
+@pytest.fixture(scope="session")
+def user_pool(request, api_backend):
+    """Hands out fresh ordinary users, on the backend the API tests talk to, that already have an access token."""
+    pool = start_pool(request.config, api_backend, inline=request.config.getoption("api_cassettes") != "off")
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def ui_user_pool(request):
+    """Like `user_pool`, but always on the real backend the frontend uses."""
+    pool = start_pool(request.config, API_BASE_URL, inline=False, session=ApiSession(API_BASE_URL))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def fresh_user(request):
+    """A user no other test has seen (on the real backend for UI tests)."""
+    pool = "ui_user_pool" if "driver" in request.fixturenames else "user_pool"
+    return request.getfixturevalue(pool).claim()
@@ -0,0 +1,199 @@
+"""
+Environment warm-up and readiness gate.
+
+Before the first test runs, the backend health check and (when UI tests are
+selected) the frontend are polled with exponential backoff. Once they answer,
+every route the suite visits is requested together with the module scripts its
+page loads, so the Vite dev server has compiled them before a browser asks, and
+the superuser token is minted so tests reuse it instead of logging in. If either
+service is not ready within --readiness-timeout the run stops immediately
+instead of every test timing out on its own, and a warm-up step that fails
+(a route erroring, the superuser login being refused) ends it the same way.
+Warm-up time is reported separately from test time.
+
+The gate runs once, in the process that controls the run, right after collection.
+Under pytest-xdist the controller collects nothing, so it gates in
+pytest_sessionstart before the workers start, judging from the selected paths. The
+token cache is per process, so each worker also mints its own token and reports
+how long that took.
+
+The stand-in backend (--api-backend=stub) and cassette modes need no backend, so
+only the frontend is gated there.
+"""
+import re
+import time
+import warnings
+from pathlib import Path
+
+import pytest
+import requests
+
+from api_helpers import api, premint_superuser_headers
+from config import BASE_URL
+
+API_TESTS = Path(__file__).parent / "tests" / "api"
+BENCHMARKS = Path(__file__).parent / "tests" / "benchmarks"
+
+ROUTES = ("/login", "/signup", "/items", "/admin", "/settings")
+
+MODULE_SCRIPT = re.compile(r'<script[^>]+type="module"[^>]+src="([^"]+)"')
+
+warmup_timings = {}
+
+
+def wait_until_ready(name, check, timeout):
+    """Poll `check` with exponential backoff until it returns True or `timeout` passes."""
+    start = time.perf_counter()
+    delay = 0.1
+    last_error = None
+    while True:
+        try:
+            if check():
+                warmup_timings[f"{name} ready"] = time.perf_counter() - start
+                return
+        except requests.RequestException as e:
+            last_error = e
+        if time.perf_counter() - start + delay > timeout:
+            pytest.exit(
+                f"{name} not ready after {timeout:.0f}s, aborting the run. Last error: {last_error}",
+                returncode=pytest.ExitCode.INTERRUPTED,
+            )
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+def backend_ready():
+    response = api.get("/utils/health-check/", timeout=5)
+    return response.status_code == 200 and response.json() is True
+
+
+def frontend_ready():
+    return requests.get(BASE_URL, timeout=5).status_code == 200
+
+
+def warm_routes():
+    start = time.perf_counter()
+    with requests.Session() as session:
+        for route in ROUTES:
+            page = session.get(f"{BASE_URL}{route}", timeout=30)
+            page.raise_for_status()
+            for src in MODULE_SCRIPT.findall(page.text):
+                session.get(f"{BASE_URL}{src}" if src.startswith("/") else src, timeout=30).raise_for_status()
+    warmup_timings["routes warmed"] = time.perf_counter() - start
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("warm-up")
+    group.addoption(
+        "--no-warmup", action="store_true", default=False,
+        help="skip the readiness gate and warm-up before the first test",
+    )
+    group.addoption(
+        "--readiness-timeout", type=float, default=60.0,
+        help="seconds to wait for the backend and frontend before aborting the run (default: 60)",
+    )
+
+
+def real_backend(config):
+    return config.getoption("api_backend") == "real" and config.getoption("api_cassettes") == "off"
+
+
+def selection(config):
+    """
+    Whether a run that collects on xdist workers needs the backend and the frontend,
+    judged from the paths it was given: tests/api drives no browser, and
+    tests/benchmarks is skipped without --benchmarks. -k and -m are not looked at,
+    so a filtered run may warm up more than it uses.
+    """
+    needs_backend = needs_frontend = False
+    for arg in config.args:
+        path = Path(config.invocation_params.dir, arg.split("::")[0]).resolve()
+        if path.is_relative_to(BENCHMARKS) and not config.getoption("benchmarks"):
+            continue
+        needs_backend = real_backend(config)
+        if not path.is_relative_to(API_TESTS):
+            needs_frontend = True
+    return needs_backend, needs_frontend
+
+
+def premint():
+    start = time.perf_counter()
+    premint_superuser_headers()
+    warmup_timings["token minted"] = time.perf_counter() - start
+
+
+def run_step(step):
+    """Run a warm-up step, ending the run cleanly if the environment answers but misbehaves."""
+    try:
+        step()
+    except (requests.RequestException, pytest.fail.Exception) as e:
+        pytest.exit(f"warm-up failed in {step.__name__}, aborting the run: {e}", returncode=pytest.ExitCode.INTERRUPTED)
+
+
+def gate(config, needs_backend, needs_frontend):
+    if not needs_backend and not needs_frontend:
+        return
+    start = time.perf_counter()
+    timeout = config.getoption("readiness_timeout")
+    if needs_backend:
+        wait_until_ready("backend", backend_ready, timeout)
+    if needs_frontend:
+        wait_until_ready("frontend", frontend_ready, timeout)
+        run_step(warm_routes)
+    if needs_backend:
+        run_step(premint)
+    warmup_timings["total"] = time.perf_counter() - start
+
+
+def skipped(config):
+    return config.getoption("no_warmup") or config.option.collectonly
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    # Under xdist the controller collects nothing, so it gates before starting the workers.
+    if not skipped(config) and not hasattr(config, "workerinput") and config.pluginmanager.hasplugin("dsession"):
+        gate(config, *selection(config))
+
+
+def pytest_collection_finish(session):
+    config = session.config
+    if skipped(config) or config.pluginmanager.hasplugin("dsession"):
+        return
+    # Tests skipped outright (benchmarks without --benchmarks, cached passes) need nothing warm.
+    items = [item for item in session.items if not item.get_closest_marker("skip")]
+    needs_backend = real_backend(config) and bool(items)
+    if not hasattr(config, "workerinput"):
+        gate(config, needs_backend, any("driver" in item.fixturenames for item in items))
+    elif needs_backend:
+        # The controller has gated, warmed up and checked the login; the token cache
+        # is per process. Ending a worker would only get it restarted, so a worker
+        # that can't mint falls back to logging in per test.
+        try:
+            premint()
+        except (requests.RequestException, pytest.fail.Exception) as e:
+            warnings.warn(f"could not pre-mint the superuser token on {config.workerinput['workerid']}: {e}")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    # Workers mint their tokens in parallel; report the slowest.
+    for name, seconds in getattr(node, "workeroutput", {}).get("warmup_timings", {}).items():
+        name = f"{name} (slowest worker)"
+        warmup_timings[name] = max(warmup_timings.get(name, 0.0), seconds)
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["warmup_timings"] = warmup_timings
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not warmup_timings:
+        return
+    stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in warmup_timings.items() if name != "total")
+    total = warmup_timings.get("total")
+    if total is None:  # only the workers warmed up
+        terminalreporter.write_line(f"warm-up: {stages}")
+    else:
+        terminalreporter.write_line(f"warm-up: {total:.2f}s before tests ({stages})")